@@ -14,6 +14,7 @@ def main() -> None:
 
     p.add_argument("--summaries-jsonl", default="data/out/project_summaries.jsonl", help="Project summaries JSONL path")
     p.add_argument("--tags-jsonl", default="data/out/review_tags.jsonl", help="Review tags JSONL path")
+    p.add_argument("--workers", type=int, default=1, help="Write packs in N parallel processes (1 = serial)")
     args = p.parse_args()
 
     export_project_packs(
@@ -23,6 +24,7 @@ def main() -> None:
         review_tags_jsonl=args.tags_jsonl,
         only_project_id=args.only_project_id,
         limit_projects=args.limit_projects,
+        workers=args.workers,
     )
 
 
@@ -18,6 +18,17 @@ def main() -> None:
 
     p.add_argument("--batch-size", type=int, default=None, help="Process only N projects and exit (for batching)")
     p.add_argument("--sleep-s", type=float, default=0.0, help="Sleep seconds between API calls (optional)")
+    p.add_argument(
+        "--rebuild-csv",
+        action="store_true",
+        help="Regenerate the CSV from the whole JSONL (default: append only this run's rows)",
+    )
+    p.add_argument(
+        "--chunksize",
+        type=int,
+        default=None,
+        help="Stream the CSV N rows at a time, keeping only each project's newest reviews (bounds memory)",
+    )
     args = p.parse_args()
 
     generate_project_summaries(
@@ -28,6 +39,8 @@ def main() -> None:
         resume=args.resume,
         batch_size=args.batch_size,
         sleep_s=args.sleep_s,
+        rebuild_csv=args.rebuild_csv,
+        chunksize=args.chunksize,
     )
 
 
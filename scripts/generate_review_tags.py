@@ -17,6 +17,22 @@ def main() -> None:
     p.add_argument("--only-project-id", default=None, help="Process reviews for one ProjectId only")
     p.add_argument("--batch-size", type=int, default=None, help="Process only N reviews then exit (for batching)")
     p.add_argument("--sleep-s", type=float, default=0.0, help="Sleep seconds between API calls (optional)")
+    p.add_argument(
+        "--use-batch-api",
+        action="store_true",
+        help="Submit all tag batches as one OpenAI Batch job (half price, finishes within 24h) and wait for it",
+    )
+    p.add_argument(
+        "--rebuild-csv",
+        action="store_true",
+        help="Regenerate the CSV from the whole JSONL (default: append only this run's rows)",
+    )
+    p.add_argument(
+        "--chunksize",
+        type=int,
+        default=None,
+        help="Stream the CSV: tag and write every N rows before reading more (bounds memory on huge files)",
+    )
     args = p.parse_args()
 
     generate_review_tags(
@@ -27,6 +43,9 @@ def main() -> None:
         only_project_id=args.only_project_id,
         batch_size=args.batch_size,
         sleep_s=args.sleep_s,
+        rebuild_csv=args.rebuild_csv,
+        use_batch_api=args.use_batch_api,
+        chunksize=args.chunksize,
     )
 
 
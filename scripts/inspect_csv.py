@@ -1,32 +1,54 @@
 from __future__ import annotations
 
 import argparse
-from pathlib import Path
 
 import pandas as pd
 from rich import print
 from rich.table import Table
 
-from review_summarizer.io import read_reviews_csv
+from review_summarizer.io import ReviewColumns, iter_reviews_csv
 
 
 def main() -> None:
     parser = argparse.ArgumentParser(description="Inspect reviews CSV (project-wise).")
     parser.add_argument("--csv", required=True, help="Path to reviews CSV")
     parser.add_argument("--top", type=int, default=15, help="Top projects by review count to display")
+    parser.add_argument(
+        "--chunksize", type=int, default=200_000, help="Rows parsed per chunk (bounds memory on huge files)"
+    )
     args = parser.parse_args()
 
-    df, cols = read_reviews_csv(args.csv)
+    cols = ReviewColumns()
 
-    print(f"[bold]Rows:[/bold] {len(df):,}")
-    print(f"[bold]Columns:[/bold] {list(df.columns)}")
+    # Stream the file: only per-project/per-rating counts are kept across chunks
+    rows = 0
+    empty_reviews = 0
+    sample = None
+    size_parts: list[pd.Series] = []
+    rating_parts: list[pd.Series] = []
+    for df in iter_reviews_csv(args.csv, columns=cols, chunksize=args.chunksize):
+        if sample is None:
+            sample_cols = [cols.project_id, cols.project_name, cols.review_text]
+            sample = df[sample_cols + ([cols.rating] if cols.rating in df.columns else [])].head(5)
+        rows += len(df)
+        empty_reviews += int((df[cols.review_text].isna() | (df[cols.review_text].str.len() == 0)).sum())
+        size_parts.append(df.groupby([cols.project_id, cols.project_name], dropna=False, observed=True).size())
+        if cols.rating in df.columns:
+            rating_parts.append(df[cols.rating].dropna().round(0).value_counts())
+
+    print(f"[bold]Rows:[/bold] {rows:,}")
+    # The file's own header: the frames above only carry the columns the pipeline reads
+    print(f"[bold]Columns:[/bold] {list(pd.read_csv(args.csv, engine='python', nrows=0).columns)}")
 
     # Basic sanity checks
-    empty_reviews = (df[cols.review_text].isna() | (df[cols.review_text].str.len() == 0)).sum()
     print(f"[bold]Empty review texts:[/bold] {empty_reviews:,}")
 
     # Project grouping
-    grp = df.groupby([cols.project_id, cols.project_name], dropna=False).size().reset_index(name="review_count")
+    sizes = pd.concat(size_parts).astype("int64") if size_parts else pd.Series(dtype="int64")
+    if len(sizes):
+        grp = sizes.groupby(level=[0, 1], dropna=False, observed=True).sum().reset_index(name="review_count")
+    else:
+        grp = pd.DataFrame(columns=[cols.project_id, cols.project_name, "review_count"])
     print(f"[bold]Unique projects:[/bold] {len(grp):,}")
 
     # Top projects
@@ -41,8 +63,8 @@ def main() -> None:
     print(table)
 
     # Rating distribution (if available)
-    if cols.rating in df.columns:
-        rating_counts = df[cols.rating].dropna().round(0).value_counts().sort_index()
+    if rating_parts:
+        rating_counts = pd.concat(rating_parts).groupby(level=0, observed=True).sum().sort_index()
         rt = Table(title="Rating distribution (rounded)")
         rt.add_column("Rating", justify="right")
         rt.add_column("Count", justify="right")
@@ -51,9 +73,9 @@ def main() -> None:
         print(rt)
 
     # Show a small sample
-    sample = df[[cols.project_id, cols.project_name, cols.review_text] + ([cols.rating] if cols.rating in df.columns else [])].head(5)
-    print("[bold]Sample rows:[/bold]")
-    print(sample.to_string(index=False))
+    if sample is not None:
+        print("[bold]Sample rows:[/bold]")
+        print(sample.to_string(index=False))
 
 
 if __name__ == "__main__":
@@ -2,11 +2,26 @@ from __future__ import annotations
 
 import os
 from dataclasses import dataclass
+from functools import lru_cache
 from dotenv import load_dotenv
 
 load_dotenv()
 
 
+def _int(name: str, default: int) -> int:
+    try:
+        return int((os.getenv(name) or str(default)).strip())
+    except ValueError:
+        return default
+
+
+def _float(name: str, default: float) -> float:
+    try:
+        return float((os.getenv(name) or str(default)).strip())
+    except ValueError:
+        return default
+
+
 @dataclass(frozen=True)
 class Settings:
     openai_api_key: str
@@ -21,32 +36,31 @@ class Settings:
     # Review tag settings (Step 2)
     tag_batch_tokens: int
     tag_batch_max_reviews: int
+    tag_pack_strategy: str
     tag_temperature: float
+    batch_api_min_reviews: int
+
+    # Concurrency settings
+    max_in_flight: int
+    max_parallel_projects: int
+    max_parallel_tag_batches: int
+    rpm_limit: int
+    tpm_limit: int
 
     out_dir: str
 
     @staticmethod
+    @lru_cache(maxsize=None)
     def from_env(out_dir: str) -> "Settings":
+        """
+        Parsed once per process and out_dir (the environment is read at startup).
+        """
         key = os.getenv("OPENAI_API_KEY", "").strip()
         if not key:
             raise ValueError("OPENAI_API_KEY is missing. Set it in .env")
 
         model = os.getenv("OPENAI_MODEL", "gpt-4.1-mini").strip()
 
-        def _int(name: str, default: int) -> int:
-            v = os.getenv(name, str(default)).strip()
-            try:
-                return int(v)
-            except ValueError:
-                return default
-
-        def _float(name: str, default: float) -> float:
-            v = os.getenv(name, str(default)).strip()
-            try:
-                return float(v)
-            except ValueError:
-                return default
-
         return Settings(
             openai_api_key=key,
             model=model,
@@ -58,7 +72,15 @@ class Settings:
 
             tag_batch_tokens=_int("OPENAI_TAG_BATCH_TOKENS", 8000),
             tag_batch_max_reviews=_int("OPENAI_TAG_BATCH_MAX_REVIEWS", 25),
+            tag_pack_strategy=(os.getenv("OPENAI_TAG_PACK_STRATEGY") or "fifo").strip().lower(),
             tag_temperature=_float("OPENAI_TAG_TEMPERATURE", 0.1),
+            batch_api_min_reviews=_int("OPENAI_BATCH_API_MIN_REVIEWS", 10_000),
+
+            max_in_flight=_int("OPENAI_MAX_IN_FLIGHT", 8),
+            max_parallel_projects=_int("OPENAI_MAX_PARALLEL_PROJECTS", 4),
+            max_parallel_tag_batches=_int("OPENAI_MAX_PARALLEL_TAG_BATCHES", 8),
+            rpm_limit=_int("OPENAI_RPM_LIMIT", 0),
+            tpm_limit=_int("OPENAI_TPM_LIMIT", 0),
 
             out_dir=out_dir,
         )
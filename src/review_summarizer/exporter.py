@@ -1,33 +1,21 @@
 from __future__ import annotations
 
-import json
+import csv
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Iterator, Optional
 
+import numpy as np
+import orjson
 import pandas as pd
 from rich import print
 
-from review_summarizer.io import read_reviews_csv
-
-
-def _read_jsonl(path: Path) -> list[dict[str, Any]]:
-    if not path.exists():
-        return []
-    out: list[dict[str, Any]] = []
-    with path.open("r", encoding="utf-8") as f:
-        for line in f:
-            line = line.strip()
-            if not line:
-                continue
-            try:
-                out.append(json.loads(line))
-            except Exception:
-                continue
-    return out
+from review_summarizer.io import read_jsonl_df, read_jsonl_records, read_reviews_csv
+from review_summarizer.review_uid import legacy_review_uid_map, make_review_uids
 
 
 def _index_project_summaries(summary_jsonl: Path) -> dict[str, dict[str, Any]]:
-    records = _read_jsonl(summary_jsonl)
+    records = read_jsonl_records(summary_jsonl)
     idx: dict[str, dict[str, Any]] = {}
     for r in records:
         pid = str(r.get("project_id", "")).strip()
@@ -36,6 +24,119 @@ def _index_project_summaries(summary_jsonl: Path) -> dict[str, dict[str, Any]]:
     return idx
 
 
+def _row_ranges(keys: pd.Series) -> dict[str, tuple[int, int]]:
+    """
+    Key column of a frame sorted by that key -> {key: (start, end)} row ranges.
+    Block boundaries are where consecutive keys differ (one vectorized compare,
+    no groupby hashing or per-group index arrays).
+    """
+    if keys.empty:
+        return {}
+    if isinstance(keys.dtype, pd.CategoricalDtype):
+        vals = keys.cat.codes.to_numpy()
+    else:
+        vals = keys.to_numpy()
+    starts = np.r_[0, np.flatnonzero(vals[1:] != vals[:-1]) + 1]
+    ends = np.r_[starts[1:], len(vals)]
+    labels = keys.iloc[starts].tolist()
+    return {str(k): (int(s), int(e)) for k, s, e in zip(labels, starts, ends)}
+
+
+_TAG_COLUMNS = ["tag_1", "tag_2", "tag_3"]
+_PACK_REVIEW_COLUMNS = ("review_uid", "Rating", "CreatedOn", "Description", "_tagged", *_TAG_COLUMNS)
+_TAG_CSV_COLUMNS = ["review_uid", "project_id", "project_name", "rating", "created_on", "tag_1", "tag_2", "tag_3"]
+
+
+def _tag_csv_rows(df_tags: pd.DataFrame) -> list[list[Any]]:
+    """
+    All tag CSV rows as Python lists, rendered once for every project
+    (missing values become "", as DataFrame.to_csv writes them).
+    """
+    return df_tags[_TAG_CSV_COLUMNS].to_numpy(dtype=object, na_value="").tolist()
+
+
+def _write_tag_csv(path: Path, rows: list[list[Any]]) -> None:
+    with path.open("w", encoding="utf-8", newline="") as f:
+        w = csv.writer(f, lineterminator="\n")
+        w.writerow(_TAG_CSV_COLUMNS)
+        w.writerows(rows)
+
+
+def _column_values(df: pd.DataFrame, name: str, n: int) -> list[Any]:
+    """
+    First n values of a column as Python objects (None if the column is absent).
+    """
+    if name not in df.columns:
+        return [None] * n
+    return df[name].iloc[:n].tolist()
+
+
+def _write_one_pack(job: tuple) -> dict[str, Any]:
+    """
+    Writes <pid>.csv (tags) and <pid>.json (pack) for one project; returns its index row.
+    Top-level (picklable) so it can run in a ProcessPoolExecutor worker.
+    """
+    pid, pname, pr, n_tags, tag_rows, project_summary, tags_by_project_dir, pack_dir = job
+
+    # Export tags csv per project (pre-rendered rows; csv.writer instead of a per-project to_csv)
+    tags_csv_path = tags_by_project_dir / f"{pid}.csv"
+    _write_tag_csv(tags_csv_path, tag_rows)
+
+    # Tagged reviews for the pack: reviews whose review_uid matched a tag record
+    # (tags were joined onto reviews up front), newest first - the leading rows of pr.
+    # Column arrays + one zip instead of to_dict(orient="records") and per-field .get()
+    n = int(pr["_tagged"].sum())
+    tr = pr.iloc[:n]
+    tagged_reviews: list[dict[str, Any]] = [
+        {
+            "review_uid": uid,
+            "project_id": pid,
+            "project_name": pname,
+            "rating": float(rt) if rt is not None and rt == rt else None,
+            "created_on": str(co) if co is not None else None,
+            "review_text": tx,  # already str + whitespace-normalized at load
+            "tags": [t1, t2, t3],
+        }
+        for uid, rt, co, tx, t1, t2, t3 in zip(
+            _column_values(tr, "review_uid", n),
+            _column_values(tr, "Rating", n),
+            _column_values(tr, "CreatedOn", n),
+            _column_values(tr, "Description", n),
+            _column_values(tr, "tag_1", n),
+            _column_values(tr, "tag_2", n),
+            _column_values(tr, "tag_3", n),
+        )
+    ]
+
+    has_summary = project_summary is not None
+    pack = {
+        "project_id": pid,
+        "project_name": pname,
+        "project_summary": project_summary,
+        "tagged_reviews": tagged_reviews,
+        "counts": {
+            "total_reviews_in_csv": int(len(pr)),
+            "tag_rows_available": n_tags,
+            "tagged_reviews_in_pack": int(len(tagged_reviews)),
+            "has_project_summary": has_summary,
+        },
+    }
+
+    pack_path = pack_dir / f"{pid}.json"
+    pack_path.write_bytes(orjson.dumps(pack, option=orjson.OPT_INDENT_2))
+
+    return {
+        "project_id": pid,
+        "project_name": pname,
+        "total_reviews_in_csv": int(len(pr)),
+        "tag_rows_available": n_tags,
+        "tagged_reviews_in_pack": int(len(tagged_reviews)),
+        "has_project_summary": has_summary,
+        "tags_csv_path": str(tags_csv_path),
+        "pack_json_path": str(pack_path),
+    }
+
+
 def export_project_packs(
     *,
     reviews_csv: str,
@@ -44,7 +145,11 @@ def export_project_packs(
     review_tags_jsonl: str = "data/out/review_tags.jsonl",
     only_project_id: str | None = None,
     limit_projects: int | None = None,
+    workers: int = 1,
 ) -> None:
+    """
+    workers > 1 writes packs in a process pool (projects are independent files).
+    """
     out_path = Path(out_dir)
     out_path.mkdir(parents=True, exist_ok=True)
 
@@ -52,119 +157,93 @@ def export_project_packs(
     df_reviews, cols = read_reviews_csv(reviews_csv)
 
     summaries_idx = _index_project_summaries(Path(project_summaries_jsonl))
-    tags_records = _read_jsonl(Path(review_tags_jsonl))
+    df_tags = read_jsonl_df(review_tags_jsonl)
 
-    if not tags_records:
+    if df_tags.empty:
         raise ValueError(f"No tag records found at: {review_tags_jsonl}")
 
-    df_tags = pd.DataFrame(tags_records)
     if "review_uid" not in df_tags.columns:
         raise ValueError("review_tags.jsonl must contain review_uid")
 
-    # review_uid is not present in original CSV, so we join using project_id + created_on + rating + description hash
-    # However, Step 2 already wrote project_id/project_name/rating/created_on in tag output.
-    # We'll join on those + review text exact match isn't present in tags output to avoid leakage. So instead we attach tags by (project_id, created_on, rating) + stable ordering.
-    # Practical approach for UI packs: provide tags dataset separately; and include review text from original CSV, mapped by project.
-    # We'll build per-project tagged list by taking all reviews for project and (if tags exist for that project) attach tags in same order for that project by created_on desc.
-
-    # Prepare review dataset per project with sorting
-    if "CreatedOn" in df_reviews.columns:
-        df_reviews["_created_on"] = pd.to_datetime(df_reviews["CreatedOn"], errors="coerce", utc=True)
-    else:
-        df_reviews["_created_on"] = pd.NaT
-
-    df_reviews["_rating"] = pd.to_numeric(df_reviews["Rating"], errors="coerce") if "Rating" in df_reviews.columns else pd.NA
-
-    # Prepare tags per project with same sorting
+    # review_uid is not present in the original CSV, but it is derived from it: recompute the
+    # same uid Step 2 wrote and hash-join tags onto reviews (one merge, no per-project alignment).
+    # Duplicate tag records for a uid (e.g. re-runs without resume) keep the first one.
+    df_reviews["review_uid"] = make_review_uids(df_reviews, cols)
+    # Tag records written before ids were read as text carry legacy uids: map those to today's
+    unmatched = df_reviews[~df_reviews["review_uid"].isin(df_tags["review_uid"])]
+    if len(unmatched):
+        legacy = legacy_review_uid_map(unmatched, cols, unmatched["review_uid"].tolist())
+        if legacy:
+            df_tags["review_uid"] = [legacy.get(u, u) for u in df_tags["review_uid"].tolist()]
+    tag_lookup = df_tags[["review_uid", *_TAG_COLUMNS]].drop_duplicates("review_uid")
+    df_reviews = df_reviews.merge(tag_lookup, on="review_uid", how="left", indicator="_merge", validate="many_to_one")
+    df_reviews["_tagged"] = df_reviews.pop("_merge").eq("both")
+
+    # Reviews already carry _created_on (parsed by read_reviews_csv); parse tags the same way
     if "created_on" in df_tags.columns:
         df_tags["_created_on"] = pd.to_datetime(df_tags["created_on"], errors="coerce", utc=True)
     else:
         df_tags["_created_on"] = pd.NaT
-    df_tags["_rating"] = pd.to_numeric(df_tags["rating"], errors="coerce") if "rating" in df_tags.columns else pd.NA
 
     # Filter projects
     grp = (
-        df_reviews.groupby([cols.project_id, cols.project_name], dropna=False)
+        df_reviews.groupby([cols.project_id, cols.project_name], dropna=False, observed=True)
         .size()
         .reset_index(name="review_count")
         .sort_values("review_count", ascending=False)
     )
 
     if only_project_id:
-        grp = grp[grp[cols.project_id].astype(str) == str(only_project_id)]
+        grp = grp[grp[cols.project_id] == str(only_project_id)]
     if limit_projects is not None:
         grp = grp.head(limit_projects)
 
+    # Sort once globally by (project, newest first): each project's rows become one
+    # contiguous, already-ordered block, so the loop below just slices row ranges (views).
+    # Reviews also put tagged rows first, so a project's tagged reviews are a prefix of its block.
+    # (Multi-key sort_values is a stable lexsort: ties keep file order.)
+    df_tags["project_id"] = df_tags["project_id"].astype(str)
+    df_reviews = df_reviews.sort_values(
+        [cols.project_id, "_tagged", cols.created_on_ts],
+        ascending=[True, False, False],
+        na_position="last",
+        ignore_index=True,
+    )
+    df_tags = df_tags.sort_values(
+        ["project_id", "_created_on"], ascending=[True, False], na_position="last", ignore_index=True
+    )
+    rev_slices = _row_ranges(df_reviews[cols.project_id])
+    tag_slices = _row_ranges(df_tags["project_id"])
+    tag_rows = _tag_csv_rows(df_tags)
+
     tags_by_project_dir = out_path / "review_tags_by_project"
     pack_dir = out_path / "project_pack"
     tags_by_project_dir.mkdir(parents=True, exist_ok=True)
     pack_dir.mkdir(parents=True, exist_ok=True)
 
-    index_rows: list[dict[str, Any]] = []
-
-    for _, r in grp.iterrows():
-        pid = str(r[cols.project_id])
-        pname = str(r[cols.project_name])
-
-        # Reviews for this project
-        pr = df_reviews[df_reviews[cols.project_id].astype(str) == pid].copy()
-        pr = pr.sort_values("_created_on", ascending=False, na_position="last")
-
-        # Tags for this project
-        pt = df_tags[df_tags["project_id"].astype(str) == pid].copy()
-        pt = pt.sort_values("_created_on", ascending=False, na_position="last")
-
-        # Export tags csv per project (direct)
-        tags_csv_path = tags_by_project_dir / f"{pid}.csv"
-        pt_out = pt[["review_uid", "project_id", "project_name", "rating", "created_on", "tag_1", "tag_2", "tag_3"]].copy()
-        pt_out.to_csv(tags_csv_path, index=False, encoding="utf-8")
-
-        # Build tagged reviews list for pack (best-effort alignment)
-        # We'll attach tags to reviews by taking the same sorted order count min(len(reviews), len(tags)).
-        tagged_reviews: list[dict[str, Any]] = []
-        pr_reviews = pr.to_dict(orient="records")
-        pt_tags = pt.to_dict(orient="records")
-
-        n = min(len(pr_reviews), len(pt_tags))
-        for i in range(n):
-            rv = pr_reviews[i]
-            tg = pt_tags[i]
-            tagged_reviews.append({
-                "project_id": pid,
-                "project_name": pname,
-                "rating": float(rv.get("Rating")) if pd.notna(rv.get("Rating")) else None,
-                "created_on": str(rv.get("CreatedOn")) if rv.get("CreatedOn") is not None else None,
-                "review_text": str(rv.get("Description") or "").strip(),
-                "tags": [tg.get("tag_1"), tg.get("tag_2"), tg.get("tag_3")],
-            })
-
-        pack = {
-            "project_id": pid,
-            "project_name": pname,
-            "project_summary": summaries_idx.get(pid),
-            "tagged_reviews": tagged_reviews,
-            "counts": {
-                "total_reviews_in_csv": int(len(pr)),
-                "tag_rows_available": int(len(pt)),
-                "tagged_reviews_in_pack": int(len(tagged_reviews)),
-                "has_project_summary": bool(pid in summaries_idx),
-            },
-        }
+    # Same columns for every project: resolved once, not per pack
+    pack_columns = [c for c in _PACK_REVIEW_COLUMNS if c in df_reviews.columns]
 
-        pack_path = pack_dir / f"{pid}.json"
-        with pack_path.open("w", encoding="utf-8") as f:
-            json.dump(pack, f, ensure_ascii=False, indent=2)
+    def _jobs() -> Iterator[tuple]:
+        for pid, pname in zip(grp[cols.project_id].astype(str).tolist(), grp[cols.project_name].astype(str).tolist()):
+            # Reviews for this project
+            rs, re_ = rev_slices.get(pid, (0, 0))
+            pr = df_reviews.iloc[rs:re_]
 
-        index_rows.append({
-            "project_id": pid,
-            "project_name": pname,
-            "total_reviews_in_csv": int(len(pr)),
-            "tag_rows_available": int(len(pt)),
-            "tagged_reviews_in_pack": int(len(tagged_reviews)),
-            "has_project_summary": bool(pid in summaries_idx),
-            "tags_csv_path": str(tags_csv_path),
-            "pack_json_path": str(pack_path),
-        })
+            # Tags for this project: the CSV rows, and their count for the index
+            ts, te = tag_slices.get(pid, (0, 0))
+
+            if workers > 1:
+                # Ship only what the worker reads (categorical columns would pickle every category)
+                pr = pr[pack_columns]
+            yield pid, pname, pr, te - ts, tag_rows[ts:te], summaries_idx.get(pid), tags_by_project_dir, pack_dir
+
+    if workers > 1:
+        # Projects write disjoint files, so packs can be built in parallel processes
+        with ProcessPoolExecutor(max_workers=workers) as ex:
+            index_rows = list(ex.map(_write_one_pack, _jobs(), chunksize=32))
+    else:
+        index_rows = [_write_one_pack(job) for job in _jobs()]
 
     index_csv = out_path / "project_pack_index.csv"
     pd.DataFrame(index_rows).to_csv(index_csv, index=False, encoding="utf-8")
@@ -1,10 +1,15 @@
 from __future__ import annotations
 
+import asyncio
+import csv
+import io
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Optional, Tuple
+from typing import IO, Any, Callable, Iterable, Iterator, Optional, Sequence, Tuple
 
+import orjson
 import pandas as pd
+from pandas.api.types import union_categoricals
 
 
 @dataclass(frozen=True)
@@ -14,51 +19,248 @@ class ReviewColumns:
     review_text: str = "Description"
     rating: str = "Rating"
     created_on: str = "CreatedOn"
+    user_id: str = "UserId"
+
+    # Derived at load time (not read from the CSV)
+    created_on_ts: str = "_created_on"  # CreatedOn parsed to UTC datetime (NaT if missing/unparseable)
+
+    def wanted(self) -> set[str]:
+        return {self.project_id, self.project_name, self.review_text, self.rating, self.created_on, self.user_id}
+
+    def key_dtypes(self) -> dict[str, type]:
+        # Review UID key fields are read as the file's text. Inferred dtypes depend on the
+        # rows parsed together (a NaN turns int ids into float: "101" vs "101.0"), so a
+        # chunked and a full read would otherwise hash different strings for the same review.
+        return {self.project_id: str, self.user_id: str, self.created_on: str}
+
+
+def _normalize_reviews(df: pd.DataFrame, columns: ReviewColumns) -> pd.DataFrame:
+    # Normalize types. IDs/names are low-cardinality, so store them as categoricals:
+    # one string per project instead of per row, and int-code hashing in groupby.
+    # (Group on these with observed=True.)
+    df[columns.project_id] = df[columns.project_id].astype(str).str.strip().astype("category")
+    df[columns.project_name] = df[columns.project_name].astype(str).str.strip().astype("category")
+
+    # Review text cleanup
+    df[columns.review_text] = (
+        df[columns.review_text]
+        .astype(str)
+        .fillna("")
+        .str.replace(r"\s+", " ", regex=True)
+        .str.strip()
+    )
+
+    # Optional rating cleanup
+    if columns.rating in df.columns:
+        df[columns.rating] = pd.to_numeric(df[columns.rating], errors="coerce")
+
+    # Parse CreatedOn once here instead of per project downstream.
+    # The raw CreatedOn string is kept as-is: review UIDs hash it.
+    if columns.created_on in df.columns:
+        df[columns.created_on_ts] = pd.to_datetime(df[columns.created_on], errors="coerce", utc=True)
+    else:
+        df[columns.created_on_ts] = pd.Series(pd.NaT, index=df.index, dtype="datetime64[ns, UTC]")
+
+    return df
+
+
+def _iter_csv_blocks(csv_path: Path, *, rows_per_block: int) -> Iterator[str]:
+    """
+    Splits the raw CSV into header-prefixed text blocks of ~rows_per_block records.
+    Record boundaries come from csv.reader with the same dialect pandas' python
+    engine uses (strict=True), so each block parses exactly like that slice of
+    the full file would - including which malformed rows get skipped.
+    (pandas' own `chunksize` raises on those rows instead of skipping them.)
+    """
+    with csv_path.open("r", encoding="utf-8", newline="") as f:
+        header = f.readline()
+        lines: list[str] = []
+
+        def _tracked_lines() -> Iterator[str]:
+            for line in f:
+                lines.append(line)
+                yield line
+
+        reader = csv.reader(_tracked_lines(), delimiter=",", quotechar='"', doublequote=True, strict=True)
+        n = 0
+        while True:
+            try:
+                next(reader)
+            except StopIteration:
+                break
+            except csv.Error:
+                pass  # keep the raw lines; pandas skips (and warns about) the same record
+            n += 1
+            if n >= rows_per_block:
+                yield header + "".join(lines)
+                lines.clear()
+                n = 0
+
+        if lines:
+            yield header + "".join(lines)
+
+
+def _check_required_columns(found: list, columns: ReviewColumns) -> None:
+    missing = [c for c in [columns.project_id, columns.project_name, columns.review_text] if c not in found]
+    if missing:
+        raise ValueError(
+            "Missing required columns in CSV: "
+            + ", ".join(missing)
+            + f"\nFound columns: {list(found)}"
+        )
+
+
+def iter_reviews_csv(
+    csv_path: str | Path,
+    *,
+    columns: ReviewColumns = ReviewColumns(),
+    chunksize: int = 200_000,
+) -> Iterator[pd.DataFrame]:
+    """
+    Streams the reviews CSV as normalized DataFrame chunks of up to `chunksize` rows.
+    Parser memory stays O(chunksize) instead of O(file). Rows hold the same values as
+    read_reviews_csv and the uid key columns are text, so review uids match a full read.
+    Other dtypes are still inferred per chunk (e.g. Rating is float only in chunks with a
+    missing rating), and so are categoricals.
+    """
+    csv_path = Path(csv_path)
+    if not csv_path.exists():
+        raise FileNotFoundError(f"CSV not found: {csv_path}")
+
+    _check_required_columns(list(pd.read_csv(csv_path, engine="python", nrows=0).columns), columns)
+
+    wanted = columns.wanted()
+    for block in _iter_csv_blocks(csv_path, rows_per_block=chunksize):
+        chunk = pd.read_csv(
+            io.StringIO(block),
+            engine="python",
+            on_bad_lines="warn",
+            usecols=lambda c: c in wanted,
+            dtype=columns.key_dtypes(),
+        )
+        if len(chunk):
+            yield _normalize_reviews(chunk, columns)
 
 
 def read_reviews_csv(
     csv_path: str | Path,
     *,
     columns: ReviewColumns = ReviewColumns(),
+    chunksize: int | None = None,
 ) -> Tuple[pd.DataFrame, ReviewColumns]:
     """
     Reads the uploaded reviews CSV robustly.
     - Uses pandas 'python' engine to tolerate messy quoting
+      (the C engine silently turns some malformed rows into garbage rows)
     - Skips malformed lines (pandas will warn)
+    - Loads only the columns the pipeline uses (ReviewColumns.wanted)
+    - chunksize: parse in blocks (see iter_reviews_csv) to bound parser memory on huge files
     """
     csv_path = Path(csv_path)
     if not csv_path.exists():
         raise FileNotFoundError(f"CSV not found: {csv_path}")
 
-    df = pd.read_csv(
-        csv_path,
-        engine="python",
-        on_bad_lines="warn",
-    )
+    wanted = columns.wanted()
 
-    missing = [c for c in [columns.project_id, columns.project_name, columns.review_text] if c not in df.columns]
-    if missing:
-        raise ValueError(
-            "Missing required columns in CSV: "
-            + ", ".join(missing)
-            + f"\nFound columns: {list(df.columns)}"
+    if chunksize is None:
+        df = pd.read_csv(
+            csv_path,
+            engine="python",
+            on_bad_lines="warn",
+            usecols=lambda c: c in wanted,
+            dtype=columns.key_dtypes(),
         )
+        _check_required_columns(list(df.columns), columns)
+        return _normalize_reviews(df, columns), columns
 
-    # Normalize types
-    df[columns.project_id] = df[columns.project_id].astype(str).str.strip()
-    df[columns.project_name] = df[columns.project_name].astype(str).str.strip()
+    chunks = list(iter_reviews_csv(csv_path, columns=columns, chunksize=chunksize))
+    if not chunks:
+        header = pd.read_csv(
+            csv_path, engine="python", nrows=0, usecols=lambda c: c in wanted, dtype=columns.key_dtypes()
+        )
+        return _normalize_reviews(header, columns), columns
+    if len(chunks) == 1:
+        return chunks[0], columns
 
-    # Review text cleanup
-    df[columns.review_text] = (
-        df[columns.review_text]
-        .astype(str)
-        .fillna("")
-        .str.replace(r"\s+", " ", regex=True)
-        .str.strip()
-    )
+    # Unify per-chunk categories so concat keeps the columns categorical
+    for col in (columns.project_id, columns.project_name):
+        cats = union_categoricals([ch[col] for ch in chunks], sort_categories=True).categories
+        for ch in chunks:
+            ch[col] = ch[col].cat.set_categories(cats)
 
-    # Optional rating cleanup
-    if columns.rating in df.columns:
-        df[columns.rating] = pd.to_numeric(df[columns.rating], errors="coerce")
+    return pd.concat(chunks, ignore_index=True), columns
 
-    return df, columns
+
+def read_jsonl_records(path: str | Path) -> list[dict[str, Any]]:
+    """
+    Tolerant JSONL reader: skips blank and corrupted/partial lines.
+    """
+    p = Path(path)
+    if not p.exists():
+        return []
+    out: list[dict[str, Any]] = []
+    with p.open("rb") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                out.append(orjson.loads(line))
+            except Exception:
+                continue
+    return out
+
+
+def read_jsonl_df(path: str | Path) -> pd.DataFrame:
+    """
+    Loads a JSONL file straight into a DataFrame (pandas' C JSON reader).
+    dtype=False keeps ids as strings, exactly as written.
+    Falls back to the tolerant line reader if a line is partial/corrupted.
+    """
+    p = Path(path)
+    if not p.exists() or p.stat().st_size == 0:
+        return pd.DataFrame()
+    try:
+        return pd.read_json(p, lines=True, dtype=False, convert_dates=False)
+    except ValueError:
+        return pd.DataFrame(read_jsonl_records(p))
+
+
+def csv_behind_jsonl(jsonl_path: str | Path, csv_path: str | Path) -> bool:
+    """
+    True if csv_path can't be extended by appending: it is missing, or the JSONL was
+    modified after it (a previous run wrote records but stopped before its CSV update).
+    """
+    j, c = Path(jsonl_path), Path(csv_path)
+    if not j.exists() or j.stat().st_size == 0:
+        return False
+    return not c.exists() or c.stat().st_mtime < j.stat().st_mtime
+
+
+def csv_appender(fp: IO[str], fieldnames: Sequence[str]) -> csv.DictWriter:
+    """
+    DictWriter on a CSV opened for append (newline=""), formatted like DataFrame.to_csv;
+    writes the header first if the file is still empty.
+    """
+    w = csv.DictWriter(fp, fieldnames=list(fieldnames), lineterminator="\n")
+    if fp.tell() == 0:
+        w.writeheader()
+    return w
+
+
+def append_csv_rows(csv_path: str | Path, fieldnames: Sequence[str], rows: Iterable[dict[str, Any]]) -> None:
+    """
+    Appends rows to a CSV (header only when the file is new), formatted like DataFrame.to_csv.
+    """
+    with Path(csv_path).open("a", encoding="utf-8", newline="") as f:
+        csv_appender(f, fieldnames).writerows(rows)
+
+
+async def run_writer(queue: "asyncio.Queue[Callable[[], Any] | None]") -> None:
+    """
+    Background writer for async pipelines: runs queued zero-arg write callables one at a time,
+    in order, in a worker thread, so disk/network-FS latency never blocks the event loop
+    (request tasks keep dispatching while a flush is in progress). Stops at None.
+    """
+    while (write := await queue.get()) is not None:
+        await asyncio.to_thread(write)
@@ -1,17 +1,36 @@
 from __future__ import annotations
 
-from openai import OpenAI
+from openai import AsyncOpenAI, OpenAI
 from tenacity import retry, stop_after_attempt, wait_exponential
 
+from review_summarizer.ratelimit import AsyncLimiter
+from review_summarizer.tokenizer import count_tokens
+
 
 def build_client(api_key: str) -> OpenAI:
     return OpenAI(api_key=api_key)
 
 
+def build_async_client(api_key: str) -> AsyncOpenAI:
+    # No SDK-internal retries: async_responses_parse retries (tenacity) through the limiter,
+    # which has to see every 429/5xx to adapt its concurrency
+    return AsyncOpenAI(api_key=api_key, max_retries=0)
+
+
 @retry(wait=wait_exponential(min=1, max=20), stop=stop_after_attempt(4))
-def responses_parse(*, client: OpenAI, model: str, input_messages: list[dict], text_format, temperature: float):
+def responses_parse(
+    *,
+    client: OpenAI,
+    model: str,
+    input_messages: list[dict],
+    text_format,
+    temperature: float,
+    prompt_cache_key: str | None = None,
+):
     """
     Wrapper with retries around client.responses.parse.
+    prompt_cache_key groups requests that share a prompt prefix (same system prompt)
+    so OpenAI's automatic prompt caching can reuse it.
     """
     return client.responses.parse(
         model=model,
@@ -19,4 +38,41 @@ def responses_parse(*, client: OpenAI, model: str, input_messages: list[dict], t
         text_format=text_format,
         temperature=temperature,
         store=False,
+        **({"prompt_cache_key": prompt_cache_key} if prompt_cache_key else {}),
     )
+
+
+@retry(wait=wait_exponential(min=1, max=20), stop=stop_after_attempt(4))
+async def async_responses_parse(
+    *,
+    client: AsyncOpenAI,
+    limiter: AsyncLimiter,
+    model: str,
+    input_messages: list[dict],
+    text_format,
+    temperature: float,
+    prompt_cache_key: str | None = None,
+    est_output_tokens: int = 0,
+):
+    """
+    Async wrapper with retries around client.responses.parse.
+    Each attempt waits for a limiter slot, so retries are throttled too.
+    The slot reserves the estimated input tokens (plus est_output_tokens) against the
+    TPM budget; the reported usage (input + output) settles it afterwards, and the
+    response's rate-limit headers keep the limiter in step with the account.
+    """
+    est_tokens = sum(count_tokens(m["content"]) for m in input_messages) + est_output_tokens
+    async with limiter.slot(tokens=est_tokens) as reserved:
+        raw = await client.responses.with_raw_response.parse(
+            model=model,
+            input=input_messages,
+            text_format=text_format,
+            temperature=temperature,
+            store=False,
+            **({"prompt_cache_key": prompt_cache_key} if prompt_cache_key else {}),
+        )
+    limiter.observe(raw.headers)
+    resp = raw.parse()
+    usage = getattr(resp, "usage", None)
+    limiter.settle(reserved=reserved, used=getattr(usage, "total_tokens", None))
+    return resp
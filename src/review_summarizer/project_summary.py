@@ -1,23 +1,39 @@
 from __future__ import annotations
 
-import json
-import time
+import asyncio
+from contextlib import ExitStack
+from functools import partial
 from pathlib import Path
-from typing import Any
+from typing import IO, Any, Iterable
 
+import orjson
 import pandas as pd
+from openai import AsyncOpenAI
 from rich import print
-from rich.progress import track
+from rich.progress import Progress
 
 from review_summarizer.config import Settings
-from review_summarizer.io import read_reviews_csv
-from review_summarizer.openai_client import build_client, responses_parse
-from review_summarizer.resume import load_processed_project_ids
+from review_summarizer.io import (
+    ReviewColumns,
+    append_csv_rows,
+    csv_behind_jsonl,
+    iter_reviews_csv,
+    read_jsonl_df,
+    read_reviews_csv,
+    run_writer,
+)
+from review_summarizer.openai_client import async_responses_parse, build_async_client
+from review_summarizer.ratelimit import AsyncLimiter
+from review_summarizer.resume import append_done_ids, done_ids_path, load_processed_project_ids
 from review_summarizer.schemas import ChunkSummary, ProjectSummary
-from review_summarizer.tokenizer import chunk_texts
+from review_summarizer.tokenizer import Chunk, chunk_texts
 
 
+# Static instructions live entirely in the system prompts and per-project data comes last
+# in the user message, so every request of a step starts with the same prefix
+# (what OpenAI's prompt caching reuses; grouped per step via prompt_cache_key).
 SYSTEM_CHUNK = """You summarize user reviews for a real-estate project in India.
+You will be given the project and a chunk of its user review snippets. Summarize ONLY what is present.
 Rules:
 - Be neutral, factual, and review-grounded.
 - Do not invent facts. If something isn't in reviews, don't claim it.
@@ -27,6 +43,7 @@ Return structured output exactly matching the schema.
 """
 
 SYSTEM_FINAL = """You produce a single project-level summary from chunk-level summaries of user reviews.
+You will be given the project and the chunk-level summaries extracted from its user reviews. Generate ONE consolidated project-level summary.
 Rules:
 - Consolidate repeated points.
 - Be neutral, factual, and review-grounded.
@@ -35,6 +52,22 @@ Rules:
 Return structured output exactly matching the schema.
 """
 
+# Projects whose reviews fit in one chunk skip the chunk step: one request straight to ProjectSummary
+SYSTEM_DIRECT = """You produce a single project-level summary from user review snippets for a real-estate project in India.
+You will be given the project and its user review snippets. Summarize ONLY what is present.
+Rules:
+- Consolidate repeated points.
+- Be neutral, factual, and review-grounded.
+- Do not invent facts. If something isn't in reviews, don't claim it.
+- Convert negatives into neutral 'watch-outs' phrasing.
+- Avoid marketing fluff.
+Return structured output exactly matching the schema.
+"""
+
+CACHE_KEY_CHUNK = "review-summary:chunk"
+CACHE_KEY_FINAL = "review-summary:final"
+CACHE_KEY_DIRECT = "review-summary:direct"
+
 
 def _prepare_project_reviews(
     df: pd.DataFrame,
@@ -44,66 +77,350 @@ def _prepare_project_reviews(
 ) -> list[str]:
     """
     Returns review snippets as strings (each snippet is one review).
+    Expects a frame from read_reviews_csv (text already whitespace-normalized),
+    with rows already most recent first (generate_project_summaries sorts once).
     """
-    # Prefer most recent reviews if CreatedOn exists and is parseable.
-    if "CreatedOn" in df.columns:
-        dt = pd.to_datetime(df["CreatedOn"], errors="coerce", utc=True)
-        df = df.assign(_created_on=dt).sort_values("_created_on", ascending=False, na_position="last")
-
     df = df.head(max_reviews)
 
-    snippets: list[str] = []
-    for _, r in df.iterrows():
-        rating = r["Rating"] if "Rating" in df.columns else None
-        text = str(r["Description"]) if "Description" in df.columns else ""
-        text = " ".join(text.split()).strip()
+    if "Description" not in df.columns:
+        return []
 
-        if not text:
+    # One pass over plain column lists: no iterrows(), and no per-call pandas
+    # overhead (projects are usually small, where Series string ops cost more than they save).
+    # NaN ratings are caught with rt == rt.
+    texts = df["Description"].tolist()
+    ratings = df["Rating"].tolist() if "Rating" in df.columns else [None] * len(texts)
+    snippets: list[str] = []
+    for rt, tx in zip(ratings, texts):
+        if not tx:
             continue
+        if len(tx) > max_review_chars:
+            tx = tx[:max_review_chars].rstrip() + "…"
+        snippets.append(f"- (Rating: {rt}) {tx}" if rt is not None and rt == rt else f"- {tx}")
+    return snippets
 
-        if len(text) > max_review_chars:
-            text = text[: max_review_chars].rstrip() + "…"
 
-        if pd.notna(rating):
-            snippets.append(f"- (Rating: {rating}) {text}")
-        else:
-            snippets.append(f"- {text}")
+_SUMMARY_TEXT_FIELDS = ("project_id", "project_name", "headline", "overall_summary")
+_SUMMARY_LIST_FIELDS = ("top_highlights", "watchouts_or_gaps", "best_for", "not_ideal_for", "evidence_notes")
 
-    return snippets
+
+def _join_list(xs: Any) -> str:
+    return " | ".join(xs) if isinstance(xs, list) else ""
+
+
+def _summary_csv_row(record: dict[str, Any]) -> dict[str, Any]:
+    row: dict[str, Any] = {k: record.get(k, "") for k in _SUMMARY_TEXT_FIELDS}
+    row.update({k: _join_list(record.get(k)) for k in _SUMMARY_LIST_FIELDS})
+    return row
 
 
 def _rebuild_csv_from_jsonl(jsonl_file: Path, csv_file: Path) -> None:
     if not jsonl_file.exists():
         return
-    records: list[dict[str, Any]] = []
-    with jsonl_file.open("r", encoding="utf-8") as f:
-        for line in f:
-            line = line.strip()
-            if not line:
-                continue
-            try:
-                records.append(json.loads(line))
-            except Exception:
-                continue
-
-    if not records:
+    df = read_jsonl_df(jsonl_file)
+    if df.empty:
         return
 
-    rows: list[dict[str, Any]] = []
-    for r in records:
-        rows.append({
-            "project_id": r.get("project_id", ""),
-            "project_name": r.get("project_name", ""),
-            "headline": r.get("headline", ""),
-            "overall_summary": r.get("overall_summary", ""),
-            "top_highlights": " | ".join(r.get("top_highlights", []) or []),
-            "watchouts_or_gaps": " | ".join(r.get("watchouts_or_gaps", []) or []),
-            "best_for": " | ".join(r.get("best_for", []) or []),
-            "not_ideal_for": " | ".join(r.get("not_ideal_for", []) or []),
-            "evidence_notes": " | ".join(r.get("evidence_notes", []) or []),
-        })
+    # Column-wise: text fields as-is, list fields joined with " | " (missing -> "")
+    out = pd.DataFrame(index=df.index)
+    for k in _SUMMARY_TEXT_FIELDS:
+        out[k] = df[k] if k in df.columns else ""
+    for k in _SUMMARY_LIST_FIELDS:
+        out[k] = df[k].map(_join_list) if k in df.columns else ""
+
+    out.to_csv(csv_file, index=False, encoding="utf-8")
+
+
+async def _summarize_chunk(
+    *,
+    client: AsyncOpenAI,
+    limiter: AsyncLimiter,
+    settings: Settings,
+    project_id: str,
+    project_name: str,
+    ch: Chunk,
+) -> ChunkSummary:
+    user_prompt = f"""Project: {project_name} (ProjectId: {project_id})
+
+REVIEW_SNIPPETS_CHUNK:
+{ch.text}
+"""
+    resp = await async_responses_parse(
+        client=client,
+        limiter=limiter,
+        model=settings.model,
+        input_messages=[
+            {"role": "system", "content": SYSTEM_CHUNK},
+            {"role": "user", "content": user_prompt},
+        ],
+        text_format=ChunkSummary,
+        temperature=settings.temperature,
+        prompt_cache_key=CACHE_KEY_CHUNK,
+    )
+
+    parsed: ChunkSummary = resp.output_parsed
+    # Keep chunk id consistent with our chunker
+    try:
+        parsed.chunk_id = ch.chunk_id  # type: ignore[attr-defined]
+    except Exception:
+        pass
+    return parsed
+
+
+async def _summarize_final(
+    *,
+    client: AsyncOpenAI,
+    limiter: AsyncLimiter,
+    settings: Settings,
+    project_id: str,
+    project_name: str,
+    system: str,
+    user: str,
+    prompt_cache_key: str,
+) -> ProjectSummary:
+    resp = await async_responses_parse(
+        client=client,
+        limiter=limiter,
+        model=settings.model,
+        input_messages=[
+            {"role": "system", "content": system},
+            {"role": "user", "content": user},
+        ],
+        text_format=ProjectSummary,
+        temperature=settings.temperature,
+        prompt_cache_key=prompt_cache_key,
+    )
+
+    parsed: ProjectSummary = resp.output_parsed
+    # Ensure IDs are correct
+    try:
+        parsed.project_id = project_id  # type: ignore[attr-defined]
+        parsed.project_name = project_name  # type: ignore[attr-defined]
+    except Exception:
+        pass
+    return parsed
+
+
+def _write_project_record(
+    *, jsonl_fp: IO[bytes], chunks_fp: IO[bytes], ids_fp: IO[str], project_id: str, record: dict[str, Any]
+) -> None:
+    jsonl_fp.write(orjson.dumps(record) + b"\n")
+    # One flush per project keeps resume safe without per-line open/close
+    chunks_fp.flush()
+    jsonl_fp.flush()
+    append_done_ids(ids_fp, [project_id])
+
+
+async def _summarize_project(
+    *,
+    client: AsyncOpenAI,
+    limiter: AsyncLimiter,
+    settings: Settings,
+    project_id: str,
+    project_name: str,
+    project_df: pd.DataFrame,
+    jsonl_fp: IO[bytes],
+    chunks_fp: IO[bytes],
+    ids_fp: IO[str],
+    writes: asyncio.Queue,
+) -> dict[str, Any] | None:
+    """
+    Summarizes one project. All chunk calls are dispatched concurrently;
+    the final aggregation runs once they have all returned.
+    A project whose reviews fit in one chunk is summarized directly in a
+    single request (no chunk summary, so no line in the chunks JSONL).
+    Writes to the run-wide file handles are queued for the background writer
+    (flushed once per project). Returns the record queued, or None if the
+    project had no usable reviews.
+    """
+    snippets = _prepare_project_reviews(
+        project_df,
+        max_reviews=settings.max_reviews_per_project,
+        max_review_chars=settings.max_review_chars,
+    )
+
+    if not snippets:
+        return None
+
+    # Chunk reviews
+    chunks = chunk_texts(snippets, max_tokens=settings.chunk_tokens)
+
+    if len(chunks) == 1:
+        system, cache_key = SYSTEM_DIRECT, CACHE_KEY_DIRECT
+        final_user = f"""Project: {project_name} (ProjectId: {project_id})
+
+REVIEW_SNIPPETS:
+{chunks[0].text}
+"""
+    else:
+        system, cache_key = SYSTEM_FINAL, CACHE_KEY_FINAL
+        chunk_summaries: list[ChunkSummary] = await asyncio.gather(*[
+            _summarize_chunk(
+                client=client,
+                limiter=limiter,
+                settings=settings,
+                project_id=project_id,
+                project_name=project_name,
+                ch=ch,
+            )
+            for ch in chunks
+        ])
+
+        writes.put_nowait(partial(chunks_fp.write, b"".join(
+            orjson.dumps({
+                "project_id": project_id,
+                "project_name": project_name,
+                "chunk_id": ch.chunk_id,
+                "chunk_token_estimate": ch.token_estimate,
+                "chunk_summary": parsed.model_dump(),
+            }) + b"\n"
+            for ch, parsed in zip(chunks, chunk_summaries)
+        )))
+
+        # Final aggregation
+        chunk_payload = "\n\n".join(
+            [
+                f"CHUNK {c.chunk_id}:\n"
+                f"Summary: {c.chunk_summary}\n"
+                f"Positives: {c.common_positives}\n"
+                f"Watchouts: {c.watchouts_or_gaps}"
+                for c in chunk_summaries
+            ]
+        )
+
+        final_user = f"""Project: {project_name} (ProjectId: {project_id})
+
+CHUNK_SUMMARIES:
+{chunk_payload}
+"""
+
+    final_parsed = await _summarize_final(
+        client=client,
+        limiter=limiter,
+        settings=settings,
+        project_id=project_id,
+        project_name=project_name,
+        system=system,
+        user=final_user,
+        prompt_cache_key=cache_key,
+    )
+    record = final_parsed.model_dump()
+    writes.put_nowait(partial(
+        _write_project_record,
+        jsonl_fp=jsonl_fp,
+        chunks_fp=chunks_fp,
+        ids_fp=ids_fp,
+        project_id=project_id,
+        record=record,
+    ))
+    return record
+
+
+async def _summarize_projects(
+    *,
+    settings: Settings,
+    jobs: list[tuple[str, str, pd.DataFrame]],
+    jsonl_file: Path,
+    chunks_file: Path,
+    sleep_s: float,
+) -> tuple[list[dict[str, Any]], list[tuple[str, BaseException]]]:
+    """
+    Runs up to settings.max_parallel_projects projects at a time. The shared
+    limiter caps in-flight requests across them and spaces request starts by sleep_s.
+    Bounding projects (not just requests) keeps only a few partially-done projects
+    alive, so finished ones land in the JSONL steadily instead of all at the end.
+    All file writes go through one background writer task (run_writer), in
+    queue order, so lines never interleave and the next requests keep being
+    dispatched while a record is written and flushed.
+    A project that still fails after retries doesn't cancel the others:
+    returns (records written, [(project_id, error), ...]).
+    """
+    limiter = AsyncLimiter(
+        max_in_flight=settings.max_in_flight,
+        min_interval_s=sleep_s,
+        rpm=settings.rpm_limit,
+        tpm=settings.tpm_limit,
+    )
+    project_sem = asyncio.Semaphore(max(1, settings.max_parallel_projects))
+
+    with ExitStack() as stack:
+        jsonl_fp = stack.enter_context(jsonl_file.open("ab", buffering=1 << 20))
+        chunks_fp = stack.enter_context(chunks_file.open("ab", buffering=1 << 20))
+        ids_fp = stack.enter_context(done_ids_path(jsonl_file).open("a", encoding="utf-8"))
+        progress = stack.enter_context(Progress())
+        task = progress.add_task("Summarizing projects", total=len(jobs))
 
-    pd.DataFrame(rows).to_csv(csv_file, index=False, encoding="utf-8")
+        writes: asyncio.Queue = asyncio.Queue()
+        writer = asyncio.create_task(run_writer(writes))
+
+        try:
+            async with build_async_client(settings.openai_api_key) as client:
+
+                async def _run(project_id: str, project_name: str, project_df: pd.DataFrame) -> dict[str, Any] | None:
+                    async with project_sem:
+                        try:
+                            return await _summarize_project(
+                                client=client,
+                                limiter=limiter,
+                                settings=settings,
+                                project_id=project_id,
+                                project_name=project_name,
+                                project_df=project_df,
+                                jsonl_fp=jsonl_fp,
+                                chunks_fp=chunks_fp,
+                                ids_fp=ids_fp,
+                                writes=writes,
+                            )
+                        finally:
+                            progress.advance(task)
+
+                results = await asyncio.gather(
+                    *[_run(pid, pname, pdf) for pid, pname, pdf in jobs],
+                    return_exceptions=True,
+                )
+        finally:
+            # Drain the pending writes before the files close
+            writes.put_nowait(None)
+            await writer
+
+    failures = [(job[0], res) for job, res in zip(jobs, results) if isinstance(res, BaseException)]
+    return [res for res in results if isinstance(res, dict)], failures
+
+
+def _newest_reviews_by_project(
+    frames: Iterable[pd.DataFrame], cols: ReviewColumns, keep: int
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Folds review frames into (review count per project, the `keep` most recent reviews of
+    each project). The kept rows are most recent first, ties (and rows without a parseable
+    CreatedOn, last) in file order: what a stable sort of the whole file gives.
+    Only the kept rows and the current frame are held, so streamed chunks need
+    O(chunk + projects * keep) memory instead of O(file).
+    """
+    keys = [cols.project_id, cols.project_name]
+    # Only what _prepare_project_reviews reads, plus the sort keys
+    wanted = [*keys, cols.review_text, cols.rating, cols.created_on_ts]
+    counts: list[pd.Series] = []
+    kept: pd.DataFrame | None = None
+    offset = 0
+    for df in frames:
+        df = df[[c for c in wanted if c in df.columns]].copy()
+        for k in keys:
+            # Categories are per chunk, so group on the strings
+            df[k] = df[k].astype(str)
+        df["_row"] = range(offset, offset + len(df))
+        offset += len(df)
+        counts.append(df.groupby(keys, dropna=False).size())
+
+        if kept is not None:
+            df = pd.concat([kept, df], ignore_index=True)
+        df = df.sort_values([cols.created_on_ts, "_row"], ascending=[False, True], na_position="last")
+        kept = df.groupby(keys, dropna=False, sort=False).head(keep).reset_index(drop=True)
+
+    if kept is None:
+        return pd.DataFrame(columns=[*keys, "review_count"]), pd.DataFrame(columns=[*keys, "_row"])
+    sizes = pd.concat(counts).groupby(level=[0, 1], dropna=False).sum()
+    return sizes.reset_index(name="review_count"), kept
 
 
 def generate_project_summaries(
@@ -115,25 +432,33 @@ def generate_project_summaries(
     resume: bool = True,
     batch_size: int | None = None,
     sleep_s: float = 0.0,
+    rebuild_csv: bool = False,
+    chunksize: int | None = None,
 ) -> None:
+    """
+    The CSV is extended with just this run's rows; rebuild_csv=True regenerates it
+    from the whole JSONL instead (also done automatically when the CSV is missing/stale).
+    chunksize streams the reviews CSV (see iter_reviews_csv), keeping only each project's
+    most recent reviews, so memory stays bounded by the chunk size and project count.
+    """
     out_path = Path(out_dir)
     out_path.mkdir(parents=True, exist_ok=True)
 
     settings = Settings.from_env(out_dir=out_dir)
-    client = build_client(settings.openai_api_key)
 
-    df, cols = read_reviews_csv(csv_path)
+    cols = ReviewColumns()
+    if chunksize is None:
+        frames: Iterable[pd.DataFrame] = [read_reviews_csv(csv_path, columns=cols)[0]]
+    else:
+        frames = iter_reviews_csv(csv_path, columns=cols, chunksize=chunksize)
 
-    # Group projects by volume (largest first)
-    grp = (
-        df.groupby([cols.project_id, cols.project_name], dropna=False)
-        .size()
-        .reset_index(name="review_count")
-        .sort_values("review_count", ascending=False)
-    )
+    # Each project is summarized from its max_reviews_per_project most recent reviews, so only
+    # those are kept; projects are ordered by volume (largest first)
+    counts, df = _newest_reviews_by_project(frames, cols, settings.max_reviews_per_project)
+    grp = counts.sort_values("review_count", ascending=False)
 
     if only_project_id:
-        grp = grp[grp[cols.project_id].astype(str) == str(only_project_id)]
+        grp = grp[grp[cols.project_id] == str(only_project_id)]
 
     if limit_projects is not None:
         grp = grp.head(limit_projects)
@@ -144,16 +469,17 @@ def generate_project_summaries(
 
     if not resume:
         # Clean run
-        for fp in (jsonl_file, csv_file, chunks_file):
+        for fp in (jsonl_file, csv_file, chunks_file, done_ids_path(jsonl_file)):
             if fp.exists():
                 fp.unlink()
 
     processed_ids = load_processed_project_ids(jsonl_file) if resume else set()
+    rebuild_csv = rebuild_csv or csv_behind_jsonl(jsonl_file, csv_file)
 
     # Apply resume skip
     if resume and processed_ids:
         before = len(grp)
-        grp = grp[~grp[cols.project_id].astype(str).isin(processed_ids)]
+        grp = grp[~grp[cols.project_id].isin(processed_ids)]
         after = len(grp)
         print(f"[bold]Resume:[/bold] skipping {before - after} already processed projects.")
 
@@ -162,122 +488,41 @@ def generate_project_summaries(
         grp = grp.head(batch_size)
 
     if len(grp) == 0:
+        if rebuild_csv:
+            _rebuild_csv_from_jsonl(jsonl_file, csv_file)
         print("[yellow]Nothing to process (all done or filtered out).[/yellow]")
         return
 
-    processed_now = 0
-
-    for _, row in track(grp.iterrows(), total=len(grp), description="Summarizing projects"):
-        project_id = str(row[cols.project_id])
-        project_name = str(row[cols.project_name])
-
-        project_df = df[
-            (df[cols.project_id].astype(str) == project_id)
-            & (df[cols.project_name].astype(str) == project_name)
-        ]
-
-        snippets = _prepare_project_reviews(
-            project_df,
-            max_reviews=settings.max_reviews_per_project,
-            max_review_chars=settings.max_review_chars,
-        )
-
-        if not snippets:
-            continue
-
-        # Chunk reviews
-        chunks = chunk_texts(snippets, max_tokens=settings.chunk_tokens)
-
-        chunk_summaries: list[ChunkSummary] = []
-        for ch in chunks:
-            user_prompt = f"""Project: {project_name} (ProjectId: {project_id})
-You will be given a chunk of user review snippets. Summarize ONLY what is present.
-
-REVIEW_SNIPPETS_CHUNK:
-{ch.text}
-"""
-            resp = responses_parse(
-                client=client,
-                model=settings.model,
-                input_messages=[
-                    {"role": "system", "content": SYSTEM_CHUNK},
-                    {"role": "user", "content": user_prompt},
-                ],
-                text_format=ChunkSummary,
-                temperature=settings.temperature,
-            )
-
-            parsed: ChunkSummary = resp.output_parsed
-            # Keep chunk id consistent with our chunker
-            try:
-                parsed.chunk_id = ch.chunk_id  # type: ignore[attr-defined]
-            except Exception:
-                pass
-
-            chunk_summaries.append(parsed)
-
-            with chunks_file.open("a", encoding="utf-8") as f:
-                f.write(json.dumps({
-                    "project_id": project_id,
-                    "project_name": project_name,
-                    "chunk_id": ch.chunk_id,
-                    "chunk_token_estimate": ch.token_estimate,
-                    "chunk_summary": parsed.model_dump(),
-                }, ensure_ascii=False) + "\n")
-
-            if sleep_s > 0:
-                time.sleep(sleep_s)
-
-        # Final aggregation
-        chunk_payload = "\n\n".join(
-            [
-                f"CHUNK {c.chunk_id}:\n"
-                f"Summary: {c.chunk_summary}\n"
-                f"Positives: {c.common_positives}\n"
-                f"Watchouts: {c.watchouts_or_gaps}"
-                for c in chunk_summaries
-            ]
+    # Row positions per project in the kept rows (in their most-recent-first order); only the
+    # projects actually processed in this run (after resume / batch-size filtering) are materialized.
+    positions = df.groupby([cols.project_id, cols.project_name], dropna=False, sort=False).indices
+
+    jobs: list[tuple[str, str, pd.DataFrame]] = []
+    for project_id, project_name in zip(grp[cols.project_id].astype(str), grp[cols.project_name].astype(str)):
+        jobs.append((project_id, project_name, df.take(positions[(project_id, project_name)])))
+
+    new_records, failures = asyncio.run(_summarize_projects(
+        settings=settings,
+        jobs=jobs,
+        jsonl_file=jsonl_file,
+        chunks_file=chunks_file,
+        sleep_s=sleep_s,
+    ))
+
+    processed_now = len(new_records)
+
+    if rebuild_csv:
+        _rebuild_csv_from_jsonl(jsonl_file, csv_file)
+    elif new_records:
+        append_csv_rows(
+            csv_file, _SUMMARY_TEXT_FIELDS + _SUMMARY_LIST_FIELDS, [_summary_csv_row(r) for r in new_records]
         )
 
-        final_user = f"""Project: {project_name} (ProjectId: {project_id})
-
-Below are chunk-level summaries extracted from user reviews. Generate ONE consolidated project-level summary.
-
-CHUNK_SUMMARIES:
-{chunk_payload}
-"""
-
-        resp_final = responses_parse(
-            client=client,
-            model=settings.model,
-            input_messages=[
-                {"role": "system", "content": SYSTEM_FINAL},
-                {"role": "user", "content": final_user},
-            ],
-            text_format=ProjectSummary,
-            temperature=settings.temperature,
-        )
-
-        final_parsed: ProjectSummary = resp_final.output_parsed
-        # Ensure IDs are correct
-        try:
-            final_parsed.project_id = project_id  # type: ignore[attr-defined]
-            final_parsed.project_name = project_name  # type: ignore[attr-defined]
-        except Exception:
-            pass
-
-        record = final_parsed.model_dump()
-
-        with jsonl_file.open("a", encoding="utf-8") as f:
-            f.write(json.dumps(record, ensure_ascii=False) + "\n")
-
-        processed_now += 1
-
-        if sleep_s > 0:
-            time.sleep(sleep_s)
-
-    # Rebuild CSV from JSONL at end (dedup-safe & resume-safe)
-    _rebuild_csv_from_jsonl(jsonl_file, csv_file)
+    if failures:
+        print(f"[red]{len(failures)} project(s) failed[/red] (processed in this run: {processed_now}); rerun with --resume to retry:")
+        for project_id, err in failures:
+            print(f"- {project_id}: {err!r}")
+        raise failures[0][1]
 
     print(f"[bold green]Done.[/bold green] Processed in this run: {processed_now}")
     print("[bold]Outputs:[/bold]")
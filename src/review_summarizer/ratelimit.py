@@ -0,0 +1,194 @@
+from __future__ import annotations
+
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Mapping
+
+
+class _TokenBucket:
+    """
+    Refills continuously at per_minute / 60 units per second, up to per_minute.
+    The level may go negative when a request turns out bigger than reserved;
+    later requests then wait for the debt to refill.
+    """
+
+    def __init__(self, per_minute: int, level: float | None = None) -> None:
+        self.capacity = float(per_minute)
+        self._rate = self.capacity / 60.0
+        self._level = self.capacity if level is None else min(self.capacity, float(level))
+        self._t: float | None = None
+
+    def _refill(self, now: float) -> None:
+        if self._t is not None:
+            self._level = min(self.capacity, self._level + (now - self._t) * self._rate)
+        self._t = now
+
+    def wait_s(self, amount: float, now: float) -> float:
+        self._refill(now)
+        need = min(amount, self.capacity)  # an oversize request waits for a full bucket, not forever
+        return 0.0 if self._level >= need else (need - self._level) / self._rate
+
+    def take(self, amount: float, now: float) -> None:
+        # amount < 0 credits back an over-reservation
+        self._refill(now)
+        self._level = min(self.capacity, self._level - amount)
+
+    def cap_level(self, remaining: float, now: float) -> None:
+        # The server's count wins when it has less left than we think (other clients, clock skew)
+        self._refill(now)
+        self._level = min(self._level, remaining)
+
+
+def _ratelimit_headers(headers: Mapping[str, str] | None, kind: str) -> tuple[int, int] | None:
+    """
+    (limit, remaining) per minute from OpenAI's x-ratelimit-{limit,remaining}-{kind} headers
+    (kind: "requests" / "tokens"), or None if they are missing or malformed.
+    """
+    if not headers:
+        return None
+    try:
+        return int(headers[f"x-ratelimit-limit-{kind}"]), int(headers[f"x-ratelimit-remaining-{kind}"])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def _throttle_retry_after_s(exc: BaseException) -> float | None:
+    """
+    Seconds to back off if exc is a 429/5xx API error (openai.APIStatusError), else None.
+    Uses the server's retry-after(-ms) header when present.
+    """
+    status = getattr(exc, "status_code", None)
+    if not isinstance(status, int) or not (status == 429 or status >= 500):
+        return None
+    headers = getattr(getattr(exc, "response", None), "headers", None) or {}
+    for name, scale in (("retry-after-ms", 0.001), ("retry-after", 1.0)):
+        try:
+            return max(0.0, float(headers.get(name)) * scale)
+        except (TypeError, ValueError):
+            continue
+    return 1.0
+
+
+class AsyncLimiter:
+    """
+    Client-side throttle for concurrent OpenAI calls.
+    - max_in_flight: at most N requests awaiting a response at once. The actual cap adapts
+      (AIMD): +1 per window of successful requests, halved on a 429/5xx (floor 1), so runs
+      settle just under the account's real limit instead of hammering it
+    - min_interval_s: minimum gap between two request starts (0 = no spacing)
+    - rpm / tpm: requests / tokens per minute budgets (token buckets; 0 = not set)
+    A 429/5xx also pauses all new starts for the server's retry-after.
+    observe() feeds in the x-ratelimit-* headers of each response: a budget that wasn't set
+    is learned from the account limit they report, and either bucket is drawn down to what
+    the server says is remaining.
+
+    Usage:
+        async with limiter.slot(tokens=estimated_tokens) as reserved:
+            resp = await client.responses.parse(...)
+        limiter.observe(response_headers)
+        limiter.settle(reserved=reserved, used=resp.usage.total_tokens)
+    """
+
+    def __init__(self, *, max_in_flight: int, min_interval_s: float = 0.0, rpm: int = 0, tpm: int = 0) -> None:
+        self._max_in_flight = max(1, int(max_in_flight))
+        self._limit = float(self._max_in_flight)
+        self._in_flight = 0
+        self._slots = asyncio.Condition()
+        self._last_decrease = float("-inf")
+        self._min_interval_s = max(0.0, float(min_interval_s))
+        self._rpm = _TokenBucket(rpm) if rpm > 0 else None
+        self._tpm = _TokenBucket(tpm) if tpm > 0 else None
+        self._start_lock = asyncio.Lock()
+        self._next_start = 0.0
+
+    @property
+    def concurrency(self) -> int:
+        return int(self._limit)
+
+    @asynccontextmanager
+    async def slot(self, *, tokens: int = 0) -> AsyncIterator[int | None]:
+        """
+        Yields the tokens actually reserved against the TPM budget (capped at its capacity;
+        None without a TPM budget), which is what settle() should be given.
+        """
+        loop = asyncio.get_running_loop()
+        async with self._slots:
+            await self._slots.wait_for(lambda: self._in_flight < int(self._limit))
+            self._in_flight += 1
+        try:
+            reserved = await self._wait_for_start_slot(tokens)
+            started = loop.time()
+            try:
+                yield reserved
+            except Exception as exc:
+                retry_after = _throttle_retry_after_s(exc)
+                if retry_after is not None:
+                    self.observe(getattr(getattr(exc, "response", None), "headers", None))
+                    # One decrease per congestion event: requests already in flight when
+                    # the cap was last cut don't cut it again
+                    if started >= self._last_decrease:
+                        self._limit = max(1.0, self._limit / 2)
+                        self._last_decrease = loop.time()
+                        self._next_start = max(self._next_start, self._last_decrease + retry_after)
+                raise
+            else:
+                self._limit = min(float(self._max_in_flight), self._limit + 1 / self._limit)
+        finally:
+            async with self._slots:
+                self._in_flight -= 1
+                self._slots.notify_all()
+
+    def settle(self, *, reserved: int | None, used: int | None) -> None:
+        """
+        Corrects the TPM bucket once the real usage (input + output tokens) is known.
+        reserved is what slot() yielded; nothing was reserved (None) without a TPM budget.
+        """
+        if self._tpm is None or reserved is None or used is None:
+            return
+        self._tpm.take(used - reserved, asyncio.get_running_loop().time())
+
+    def observe(self, headers: Mapping[str, str] | None) -> None:
+        """
+        Syncs the RPM/TPM buckets with the x-ratelimit-* headers of an API response.
+        """
+        now = asyncio.get_running_loop().time()
+        for attr, kind in (("_rpm", "requests"), ("_tpm", "tokens")):
+            limits = _ratelimit_headers(headers, kind)
+            if limits is None:
+                continue
+            limit, remaining = limits
+            bucket = getattr(self, attr)
+            if bucket is None:
+                if limit > 0:
+                    setattr(self, attr, _TokenBucket(limit, level=remaining))
+            else:
+                bucket.cap_level(remaining, now)
+
+    async def _wait_for_start_slot(self, tokens: int) -> int | None:
+        loop = asyncio.get_running_loop()
+        if self._rpm is None and self._tpm is None and self._next_start <= loop.time():
+            if self._min_interval_s > 0:
+                self._next_start = loop.time() + self._min_interval_s
+            return None
+        # Starts are serialized, so waiting requests are admitted in arrival order
+        async with self._start_lock:
+            while True:
+                now = loop.time()
+                delay = max(
+                    self._next_start - now,
+                    self._rpm.wait_s(1, now) if self._rpm else 0.0,
+                    self._tpm.wait_s(tokens, now) if self._tpm else 0.0,
+                )
+                if delay <= 0:
+                    break
+                # Re-check at least every 0.5s: settle() may credit tokens back meanwhile
+                await asyncio.sleep(min(delay, 0.5))
+            now = loop.time()
+            reserved = None
+            if self._rpm:
+                self._rpm.take(1, now)
+            if self._tpm:
+                reserved = min(tokens, int(self._tpm.capacity))
+                self._tpm.take(reserved, now)
+            self._next_start = max(self._next_start, now + self._min_interval_s)
+            return reserved
@@ -1,31 +1,87 @@
 from __future__ import annotations
 
-import json
+import re
 from pathlib import Path
-from typing import Set
+from typing import IO, Iterable, Set
 
+import orjson
 
-def load_processed_project_ids(jsonl_path: str | Path) -> Set[str]:
+
+def done_ids_path(jsonl_path: str | Path) -> Path:
     """
-    Reads project_summaries.jsonl and returns a set of processed project_ids.
-    Safe against partially written lines.
+    Sidecar index next to a JSONL output (e.g. project_summaries.ids):
+    one finished id per line, append-only, written right after the JSONL record.
     """
-    p = Path(jsonl_path)
-    if not p.exists():
-        return set()
+    return Path(jsonl_path).with_suffix(".ids")
+
 
+def append_done_ids(fp: IO[str], ids: Iterable[str]) -> None:
+    fp.write("".join(f"{i}\n" for i in ids))
+    fp.flush()
+
+
+def _id_field_re(id_field: str) -> re.Pattern[bytes]:
+    # Our writers put the id first: {"<id_field>": "<plain value>", ...}. Anchored at the line start,
+    # so it never looks inside other values; other layouts or escaped values fall back to a full parse.
+    return re.compile(rb'\{\s*"' + re.escape(id_field.encode("utf-8")) + rb'"\s*:\s*"([^"\\]*)"')
+
+
+def _scan_jsonl_ids(p: Path, id_field: str) -> Set[str]:
     processed: Set[str] = set()
-    with p.open("r", encoding="utf-8") as f:
+    id_re = _id_field_re(id_field)
+    with p.open("rb") as f:
         for line in f:
             line = line.strip()
             if not line:
                 continue
+            # Fast path: pull the id with a regex instead of building a dict per record.
+            # Only complete lines qualify, a truncated tail must still be ignored.
+            m = id_re.match(line) if line.endswith(b"}") else None
+            if m:
+                v = m.group(1).decode("utf-8", errors="replace").strip()
+                if v:
+                    processed.add(v)
+                continue
             try:
-                obj = json.loads(line)
-                pid = str(obj.get("project_id", "")).strip()
-                if pid:
-                    processed.add(pid)
+                obj = orjson.loads(line)
+                v = str(obj.get(id_field, "")).strip()
+                if v:
+                    processed.add(v)
             except Exception:
                 # ignore corrupted/partial line
                 continue
     return processed
+
+
+def load_done_ids(jsonl_path: str | Path, *, id_field: str) -> Set[str]:
+    """
+    Returns the set of ids already written to jsonl_path.
+    Reads the small .ids sidecar when present; otherwise scans the JSONL once
+    (older runs) and seeds the sidecar so later resumes skip the JSON parse.
+    """
+    p = Path(jsonl_path)
+    sidecar = done_ids_path(p)
+    if not p.exists():
+        # Stale sidecar without its JSONL would skip work that was never written
+        if sidecar.exists():
+            sidecar.unlink()
+        return set()
+
+    if sidecar.exists():
+        text = sidecar.read_text(encoding="utf-8")
+        lines = text.split("\n")
+        if not text.endswith("\n"):
+            lines = lines[:-1]  # drop a partially written last id
+        return {line for line in lines if line}
+
+    processed = _scan_jsonl_ids(p, id_field)
+    sidecar.write_text("".join(f"{i}\n" for i in sorted(processed)), encoding="utf-8")
+    return processed
+
+
+def load_processed_project_ids(jsonl_path: str | Path) -> Set[str]:
+    """
+    Reads project_summaries.jsonl and returns a set of processed project_ids.
+    Safe against partially written lines.
+    """
+    return load_done_ids(jsonl_path, id_field="project_id")
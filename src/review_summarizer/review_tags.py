@@ -1,21 +1,36 @@
 from __future__ import annotations
 
-import json
+import asyncio
+import heapq
 import re
-import time
+from contextlib import ExitStack
+from functools import lru_cache, partial
+from itertools import chain
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import IO, Any, Dict, Iterable, Iterator, List
 
+import orjson
 import pandas as pd
+from openai import AsyncOpenAI
 from rich import print
-from rich.progress import track
+from rich.progress import Progress
 
 from review_summarizer.config import Settings
-from review_summarizer.io import read_reviews_csv
-from review_summarizer.openai_client import build_client, responses_parse
-from review_summarizer.review_uid import make_review_uid
+from review_summarizer.io import (
+    ReviewColumns,
+    csv_appender,
+    csv_behind_jsonl,
+    iter_reviews_csv,
+    read_jsonl_df,
+    read_reviews_csv,
+    run_writer,
+)
+from review_summarizer.openai_client import async_responses_parse, build_async_client, build_client
+from review_summarizer.ratelimit import AsyncLimiter
+from review_summarizer.resume import append_done_ids, done_ids_path, load_done_ids
+from review_summarizer.review_uid import legacy_review_uid_map, make_review_uids
 from review_summarizer.tag_schemas import ReviewTagBatch
-from review_summarizer.tokenizer import count_tokens
+from review_summarizer.tokenizer import count_tokens_batch
 
 
 SYSTEM_TAGS = """You generate exactly 3 short UI tags for each user review of a real-estate project.
@@ -32,67 +47,47 @@ Hard rules:
 
 Important:
 - Keep tags short; aim <= 28 characters.
+
+Input: a JSON array of review items (or a single item), each with an idx.
+Return:
+- items: array of objects, each with idx and tags (exactly 3 tags).
+- One output per input idx.
 Return structured output exactly matching the schema.
 """
 
+# Static instructions stay in SYSTEM_TAGS and the review JSON comes last, so tag requests
+# share one prompt prefix (OpenAI prompt caching; grouped via prompt_cache_key).
+CACHE_KEY_TAGS = "review-tags"
+
+# Rough answer size per review ({"idx":..,"tags":[3 short tags]}), reserved against the TPM budget
+_TAG_OUTPUT_TOKENS_PER_REVIEW = 24
+
+# Compiled once: tag cleanup runs for every tag of every review
+_RE_BAD_PUNCT = re.compile(r"[^\w\s&/-]")
+
 
 def _load_processed_review_uids(jsonl_path: Path) -> set[str]:
-    if not jsonl_path.exists():
-        return set()
-    out: set[str] = set()
-    with jsonl_path.open("r", encoding="utf-8") as f:
-        for line in f:
-            line = line.strip()
-            if not line:
-                continue
-            try:
-                obj = json.loads(line)
-                uid = str(obj.get("review_uid", "")).strip()
-                if uid:
-                    out.add(uid)
-            except Exception:
-                continue
-    return out
+    return load_done_ids(jsonl_path, id_field="review_uid")
 
 
 def _rebuild_csv_from_jsonl(jsonl_file: Path, csv_file: Path) -> None:
     if not jsonl_file.exists():
         return
-    records: list[dict[str, Any]] = []
-    with jsonl_file.open("r", encoding="utf-8") as f:
-        for line in f:
-            line = line.strip()
-            if not line:
-                continue
-            try:
-                records.append(json.loads(line))
-            except Exception:
-                continue
-    if not records:
+    df = read_jsonl_df(jsonl_file)
+    if df.empty:
         return
-    pd.DataFrame(records).to_csv(csv_file, index=False, encoding="utf-8")
-
-
-def _title_case_preserve_acronyms(s: str) -> str:
-    words = [w for w in re.split(r"\s+", s.strip()) if w]
-    out = []
-    for w in words:
-        # keep acronyms like "UPI", "RERA" as-is
-        if len(w) <= 5 and w.isupper():
-            out.append(w)
-        elif w.islower():
-            out.append(w[:1].upper() + w[1:])
-        else:
-            out.append(w[:1].upper() + w[1:])
-    return " ".join(out)
+    df.to_csv(csv_file, index=False, encoding="utf-8")
+
+
+def _title_case_word(w: str) -> str:
+    # keep acronyms like "UPI", "RERA" as-is
+    return w if len(w) <= 5 and w.isupper() else w[:1].upper() + w[1:]
 
 
 def _clean_tag(tag: str) -> str:
-    tag = (tag or "").strip().strip('"').strip("'")
-    tag = re.sub(r"[^\w\s&/-]", "", tag)  # remove weird punctuation, keep &, /, -
-    tag = re.sub(r"\s+", " ", tag).strip()
-    tag = _title_case_preserve_acronyms(tag)
-    return tag
+    # One pass: drop weird punctuation (keeps &, /, -; quotes go too), then split on
+    # whitespace runs and Title-case each word (the join leaves single spaces, no ends)
+    return " ".join(_title_case_word(w) for w in _RE_BAD_PUNCT.sub("", tag or "").split())
 
 
 def _shorten_tag(tag: str, max_len: int = 28) -> str:
@@ -120,16 +115,96 @@ def _shorten_tag(tag: str, max_len: int = 28) -> str:
     return tag2
 
 
-def _pack_reviews_for_batch(reviews: List[Dict[str, Any]], max_tokens: int) -> List[List[Dict[str, Any]]]:
+@lru_cache(maxsize=8192)
+def _ui_tag(raw: str) -> str:
+    # Models reuse the same phrasings across reviews, so each distinct raw tag is cleaned once per run
+    return _shorten_tag(raw, 28)[:28].rstrip()  # final hard clamp
+
+
+def _ui_tags(raw_tags: List[str]) -> List[str]:
+    return [_ui_tag(t) for t in raw_tags]
+
+
+def _model_item(idx: int, review: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    What the model sees for one review: a short per-batch idx instead of the 40-char
+    review_uid (fewer prompt + output tokens); answers are mapped back by position.
+    Internal bookkeeping fields (leading underscore) are not sent.
+    """
+    return {"idx": idx, **{k: v for k, v in review.items() if k != "review_uid" and not k.startswith("_")}}
+
+
+def _model_item_json(idx: int, review: Dict[str, Any]) -> str:
+    """
+    orjson text of _model_item(idx, review). The fields after idx are serialized once and
+    cached on the payload as "_json", so packing, prompts and retries splice in a string.
+    """
+    body = review.get("_json")
+    if body is None:
+        body = review["_json"] = orjson.dumps(_model_item(idx, review)).decode("utf-8").split(",", 1)[1]
+    return f'{{"idx":{idx},{body}'
+
+
+def _dedupe_key(text: str) -> str:
+    # Tags are title-cased and never quote the text, so case and spacing don't change them
+    return " ".join(text.casefold().split())
+
+
+def _dedupe_payloads(payloads: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    One representative payload per review_text, compared case- and whitespace-insensitively
+    (tags are grounded only in the text). Later copies ride along on the representative as
+    "_duplicates" and get its tags when records are written.
+    """
+    reps: Dict[str, Dict[str, Any]] = {}
+    for p in payloads:
+        key = _dedupe_key(p["review_text"])
+        rep = reps.get(key)
+        if rep is None:
+            reps[key] = p
+        else:
+            rep.setdefault("_duplicates", []).append(p)
+    return list(reps.values())
+
+
+def _ensure_token_estimates(reviews: List[Dict[str, Any]]) -> None:
+    """
+    Stores each review's prompt-JSON token estimate on the payload as "_token_est"
+    (one batched tokenizer call for the reviews that don't have one yet).
+    """
+    todo = [r for r in reviews if "_token_est" not in r]
+    if not todo:
+        return
+    counts = count_tokens_batch([_model_item_json(0, r) for r in todo])
+    for r, t in zip(todo, counts):
+        r["_token_est"] = t
+
+
+def _pack_reviews_for_batch(
+    reviews: List[Dict[str, Any]], max_tokens: int, max_reviews: int, strategy: str = "fifo"
+) -> List[List[Dict[str, Any]]]:
+    """
+    Pack reviews into request batches bounded by BOTH token estimate and count.
+    Token estimates are computed once per payload, so re-packing is free.
+    strategy:
+    - "fifo": greedy in input order, a new batch whenever the next review doesn't fit
+    - "wfd": worst-fit decreasing, longest reviews first, each into the open batch with the most room left
+      (fewer, fuller batches when the token limit binds before the count limit)
+    """
+    _ensure_token_estimates(reviews)
+    if strategy == "wfd":
+        return _pack_worst_fit_decreasing(reviews, max_tokens, max_reviews)
+    if strategy != "fifo":
+        raise ValueError(f"Unknown tag pack strategy {strategy!r} (expected 'fifo' or 'wfd')")
+
     batches: List[List[Dict[str, Any]]] = []
     buf: List[Dict[str, Any]] = []
     buf_tokens = 0
 
     for r in reviews:
-        payload = json.dumps(r, ensure_ascii=False)
-        t = count_tokens(payload)
+        t = r["_token_est"]
 
-        if buf and buf_tokens + t > max_tokens:
+        if buf and (buf_tokens + t > max_tokens or len(buf) >= max_reviews):
             batches.append(buf)
             buf = []
             buf_tokens = 0
@@ -143,201 +218,484 @@ def _pack_reviews_for_batch(reviews: List[Dict[str, Any]], max_tokens: int) -> L
     return batches
 
 
-def _regen_single_review_tags(*, client, model: str, temperature: float, review_obj: Dict[str, Any]) -> List[str]:
+def _pack_worst_fit_decreasing(
+    reviews: List[Dict[str, Any]], max_tokens: int, max_reviews: int
+) -> List[List[Dict[str, Any]]]:
+    # Worst-fit decreasing bin packing: a max-heap of open batches by remaining tokens means one
+    # check per review (the roomiest batch) instead of first-fit's scan over all open batches.
+    # Full batches (by count) leave the heap. A review bigger than max_tokens gets its own batch.
+    batches: List[List[Dict[str, Any]]] = []
+    room: List[tuple[int, int]] = []  # (-tokens left, batch index)
+    for r in sorted(reviews, key=lambda x: x["_token_est"], reverse=True):
+        t = r["_token_est"]
+        if room and -room[0][0] >= t:
+            left, i = heapq.heappop(room)
+            left = -left - t
+            batches[i].append(r)
+        else:
+            i = len(batches)
+            left = max_tokens - t
+            batches.append([r])
+        if len(batches[i]) < max_reviews:
+            heapq.heappush(room, (-left, i))
+    return batches
+
+
+async def _regen_single_review_tags(
+    *, client: AsyncOpenAI, limiter: AsyncLimiter, settings: Settings, review_obj: Dict[str, Any]
+) -> List[str]:
     """
     If post-processing still violates constraints, regenerate strictly for a single review.
     """
     strict_system = SYSTEM_TAGS + "\nSTRICT: Each tag MUST be <= 28 characters. No exceptions."
-    one_prompt = f"""Generate tags for this single review.
+    one_prompt = f"""Generate tags for this single review (return exactly 1 item, idx 0).
 
 InputReviewJSON:
-{json.dumps(review_obj, ensure_ascii=False)}
-
-Return:
-- items: array with exactly 1 object for this review_uid.
+{_model_item_json(0, review_obj)}
 """
-    resp = responses_parse(
+    resp = await async_responses_parse(
         client=client,
-        model=model,
+        limiter=limiter,
+        model=settings.model,
         input_messages=[
             {"role": "system", "content": strict_system},
             {"role": "user", "content": one_prompt},
         ],
         text_format=ReviewTagBatch,
-        temperature=temperature,
+        temperature=settings.tag_temperature,
+        prompt_cache_key=CACHE_KEY_TAGS,
+        est_output_tokens=_TAG_OUTPUT_TOKENS_PER_REVIEW,
     )
     parsed: ReviewTagBatch = resp.output_parsed
-    raw = parsed.items[0].tags
-    fixed = [_shorten_tag(t, 28) for t in raw]
-    # Final hard clamp
-    fixed = [t[:28].rstrip() for t in fixed]
-    return fixed
+    return _ui_tags(parsed.items[0].tags)
 
 
-def generate_review_tags(
+def _batch_messages(b: List[Dict[str, Any]]) -> list[dict]:
+    user_prompt = f"""Generate tags for each review item below.
+
+InputReviewsJSON:
+[{",".join(_model_item_json(i, one) for i, one in enumerate(b))}]
+"""
+    return [
+        {"role": "system", "content": SYSTEM_TAGS},
+        {"role": "user", "content": user_prompt},
+    ]
+
+
+def _tags_invalid(tags: List[str] | None) -> bool:
+    return not tags or len(tags) != 3 or any((not t.strip()) for t in tags) or any(len(t) > 28 for t in tags)
+
+
+async def _finalize_batch_tags(
     *,
-    csv_path: str,
-    out_dir: str,
-    resume: bool = True,
-    limit_rows: int | None = None,
-    only_project_id: str | None = None,
-    batch_size: int | None = None,
-    sleep_s: float = 0.0,
-) -> None:
-    out_path = Path(out_dir)
-    out_path.mkdir(parents=True, exist_ok=True)
+    client: AsyncOpenAI,
+    limiter: AsyncLimiter,
+    settings: Settings,
+    b: List[Dict[str, Any]],
+    parsed: ReviewTagBatch | None,
+) -> Dict[str, List[str]]:
+    """
+    Maps a batch answer back to review_uids and enforces UI constraints.
+    Reviews with a missing/invalid answer are regenerated individually
+    (concurrently, under the same limiter as the batch requests).
+    parsed=None (unparseable answer) regenerates the whole batch that way.
+    """
+    out_map: Dict[str, List[str]] = {}
 
-    settings = Settings.from_env(out_dir=out_dir)
-    client = build_client(settings.openai_api_key)
+    for it in (parsed.items if parsed is not None else []):
+        if 0 <= it.idx < len(b):
+            out_map[b[it.idx]["review_uid"]] = _ui_tags(it.tags)
 
-    df, cols = read_reviews_csv(csv_path)
+    async def _regen(reviews: List[Dict[str, Any]]) -> None:
+        fixed = await asyncio.gather(*[
+            _regen_single_review_tags(client=client, limiter=limiter, settings=settings, review_obj=one)
+            for one in reviews
+        ])
+        out_map.update((one["review_uid"], tags) for one, tags in zip(reviews, fixed))
 
-    if only_project_id:
-        df = df[df[cols.project_id].astype(str) == str(only_project_id)]
+    # Ensure every input uid got output; regenerate missing individually
+    missing = [x for x in b if x["review_uid"] not in out_map]
+    if missing:
+        print(f"[yellow]Batch missing {len(missing)} items. Retrying individually.[/yellow]")
+        await _regen(missing)
 
-    if limit_rows is not None:
-        df = df.head(limit_rows)
+    # If any tags still violate length or emptiness, regenerate individually (rare)
+    invalid = [one for one in b if _tags_invalid(out_map.get(one["review_uid"]))]
+    if invalid:
+        await _regen(invalid)
 
-    jsonl_file = out_path / "review_tags.jsonl"
-    csv_file = out_path / "review_tags.csv"
+    return out_map
 
-    if not resume:
-        for fp in (jsonl_file, csv_file):
-            if fp.exists():
-                fp.unlink()
 
-    df["_review_uid"] = df.apply(
-        lambda r: make_review_uid(
-            project_id=str(r[cols.project_id]),
-            user_id=r["UserId"] if "UserId" in df.columns else None,
-            created_on=r["CreatedOn"] if "CreatedOn" in df.columns else None,
-            description=r[cols.review_text],
-        ),
-        axis=1,
+# Column order of review_tags.jsonl records and review_tags.csv
+_TAG_FIELDS = ("review_uid", "project_id", "project_name", "rating", "created_on", "tag_1", "tag_2", "tag_3")
+
+
+def _tag_records(
+    b: List[Dict[str, Any]],
+    out_map: Dict[str, List[str]],
+    skip_uids: set[str] | frozenset[str] = frozenset(),
+) -> List[Dict[str, Any]]:
+    """
+    One output record per tagged review of batch b, plus one per duplicate of it (same tags).
+    """
+    records: List[Dict[str, Any]] = []
+    for one in b:
+        tags = out_map.get(one["review_uid"])
+        if not tags:
+            continue
+        for member in (one, *one.get("_duplicates", ())):
+            if member["review_uid"] in skip_uids:
+                continue
+            records.append({
+                "review_uid": member["review_uid"],
+                "project_id": member["project_id"],
+                "project_name": member["project_name"],
+                "rating": member.get("rating"),
+                "created_on": member.get("created_on"),
+                "tag_1": tags[0],
+                "tag_2": tags[1],
+                "tag_3": tags[2],
+            })
+    return records
+
+
+def _write_tag_records(
+    jsonl_fp: IO[bytes], ids_fp: IO[str], records: List[Dict[str, Any]], csv_fp: IO[str] | None = None
+) -> None:
+    """
+    Appends a batch's records in one write + flush on the run-wide handle (and as rows
+    to the CSV, if given), then records their uids in the .ids resume index.
+    """
+    jsonl_fp.write(b"".join(orjson.dumps(rec) + b"\n" for rec in records))
+    # Flush before indexing the uids so the .ids file never runs ahead of the JSONL
+    jsonl_fp.flush()
+    # Written after the JSONL, so an interrupted write leaves the CSV older (csv_behind_jsonl)
+    if csv_fp is not None:
+        csv_appender(csv_fp, _TAG_FIELDS).writerows(records)
+        csv_fp.flush()
+    append_done_ids(ids_fp, [rec["review_uid"] for rec in records])
+
+
+async def _tag_batches(
+    *,
+    settings: Settings,
+    batch_groups: Iterable[List[List[Dict[str, Any]]]],
+    jsonl_fp: IO[bytes],
+    ids_fp: IO[str],
+    csv_fp: IO[str] | None,
+    sleep_s: float,
+) -> tuple[int, List[BaseException]]:
+    """
+    Live path: settings.max_parallel_tag_batches workers pull packed batches from a bounded
+    queue. batch_groups (one list of batches per CSV chunk) is advanced in a thread while
+    the workers run, so the next chunk is read and packed during the current chunk's last
+    requests, and one limiter (AIMD cap, RPM/TPM budgets) spans the whole run.
+    The limiter caps in-flight requests (batch calls and per-review regenerations alike) and
+    spaces request starts by sleep_s. Each batch is queued for the background writer as
+    soon as it is done, so results land in the JSONL in completion order.
+    A batch that still fails after retries doesn't stop the others:
+    returns (number of records written, [error, ...]).
+    """
+    limiter = AsyncLimiter(
+        max_in_flight=settings.max_in_flight,
+        min_interval_s=sleep_s,
+        rpm=settings.rpm_limit,
+        tpm=settings.tpm_limit,
     )
+    n_workers = max(1, settings.max_parallel_tag_batches)
+    # Small, so the producer only moves on to the next chunk as the current one drains
+    pending: asyncio.Queue = asyncio.Queue(maxsize=2 * n_workers)
+    written = 0
+    failures: List[BaseException] = []
+
+    with Progress() as progress:
+        task = progress.add_task("Generating tags", total=0)
+        writes: asyncio.Queue = asyncio.Queue()
+        writer = asyncio.create_task(run_writer(writes))
+
+        try:
+            async with build_async_client(settings.openai_api_key) as client:
+
+                async def _run(b: List[Dict[str, Any]]) -> None:
+                    nonlocal written
+                    try:
+                        resp = await async_responses_parse(
+                            client=client,
+                            limiter=limiter,
+                            model=settings.model,
+                            input_messages=_batch_messages(b),
+                            text_format=ReviewTagBatch,
+                            temperature=settings.tag_temperature,
+                            prompt_cache_key=CACHE_KEY_TAGS,
+                            est_output_tokens=_TAG_OUTPUT_TOKENS_PER_REVIEW * len(b),
+                        )
+                        out_map = await _finalize_batch_tags(
+                            client=client, limiter=limiter, settings=settings, b=b, parsed=resp.output_parsed
+                        )
+                        records = _tag_records(b, out_map)
+                        writes.put_nowait(partial(_write_tag_records, jsonl_fp, ids_fp, records, csv_fp))
+                        written += len(records)
+                    finally:
+                        progress.advance(task)
+
+                async def _worker() -> None:
+                    while (b := await pending.get()) is not None:
+                        try:
+                            await _run(b)
+                        except Exception as exc:
+                            failures.append(exc)
+
+                async def _produce() -> None:
+                    total = 0
+                    groups = iter(batch_groups)
+                    try:
+                        while (group := await asyncio.to_thread(next, groups, None)) is not None:
+                            total += len(group)
+                            progress.update(task, total=total)
+                            for b in group:
+                                await pending.put(b)
+                    finally:
+                        for _ in range(n_workers):
+                            await pending.put(None)
+
+                workers = [asyncio.create_task(_worker()) for _ in range(n_workers)]
+                # Workers finish the queued batches even if reading the next chunk fails
+                produced, *_ = await asyncio.gather(_produce(), *workers, return_exceptions=True)
+                if isinstance(produced, BaseException):
+                    raise produced
+        finally:
+            # Drain the pending writes before the files close
+            writes.put_nowait(None)
+            await writer
+
+    return written, failures
+
+
+def _frame_batches(
+    frames: Iterable[pd.DataFrame],
+    *,
+    settings: Settings,
+    cols: ReviewColumns,
+    processed: set[str],
+    only_project_id: str | None,
+    limit_rows: int | None,
+    batch_size: int | None,
+    seen: Dict[str, int],
+) -> Iterator[tuple[List[List[Dict[str, Any]]], int]]:
+    """
+    Per frame of reviews: filter, resume-skip, dedupe and pack, yielding
+    (packed batches, number of unique texts) for each frame that has anything to tag.
+    Counts rows and payloads seen into seen["rows"] / seen["payloads"].
+    """
+    rows_left = limit_rows
+    payloads_left = batch_size
+
+    for df in frames:
+        if only_project_id:
+            df = df[df[cols.project_id] == str(only_project_id)]
+
+        if rows_left is not None:
+            df = df.head(rows_left)
+            rows_left -= len(df)
+
+        df["_review_uid"] = make_review_uids(df, cols)
+
+        if processed:
+            before = len(df)
+            done = df["_review_uid"].isin(processed)
+            if not done.all():
+                # Outputs from before ids were read as text hold legacy uids for the same reviews
+                todo = df[~done]
+                legacy = legacy_review_uid_map(todo, cols, todo["_review_uid"].tolist())
+                done |= df["_review_uid"].isin({uid for old, uid in legacy.items() if old in processed})
+            df = df[~done]
+            after = len(df)
+            if before > after:
+                print(f"[bold]Resume:[/bold] skipping {before - after} already processed reviews.")
+
+        seen["rows"] += len(df)
+        payloads = _review_payloads(df, cols)
+
+        if payloads_left is not None:
+            payloads = payloads[:payloads_left]
+            payloads_left -= len(payloads)
+
+        seen["payloads"] += len(payloads)
+        if payloads:
+            unique_payloads = _dedupe_payloads(payloads)
+            if len(unique_payloads) < len(payloads):
+                print(
+                    f"[bold]Dedup:[/bold] {len(payloads)} reviews -> {len(unique_payloads)} unique texts "
+                    f"({1 - len(unique_payloads) / len(payloads):.1%} fewer to tag)."
+                )
 
-    processed = _load_processed_review_uids(jsonl_file) if resume else set()
-    if resume and processed:
-        before = len(df)
-        df = df[~df["_review_uid"].isin(processed)]
-        after = len(df)
-        print(f"[bold]Resume:[/bold] skipping {before - after} already processed reviews.")
-
-    if len(df) == 0:
-        print("[yellow]Nothing to process (all done or filtered out).[/yellow]")
-        return
+            batches = _pack_reviews_for_batch(
+                unique_payloads,
+                max_tokens=settings.tag_batch_tokens,
+                max_reviews=settings.tag_batch_max_reviews,
+                strategy=settings.tag_pack_strategy,
+            )
+            yield batches, len(unique_payloads)
+
+        if rows_left == 0 or payloads_left == 0:
+            break
 
+
+def _review_payloads(df: pd.DataFrame, cols: ReviewColumns) -> List[Dict[str, Any]]:
+    # Plain column lists zipped together: no per-row Series like df.iterrows()
+    n = len(df)
+    ratings = df["Rating"].tolist() if "Rating" in df.columns else [None] * n
+    created = df["CreatedOn"].astype(str).tolist() if "CreatedOn" in df.columns else [None] * n
     payloads: List[Dict[str, Any]] = []
-    for _, r in df.iterrows():
-        text = str(r[cols.review_text]).strip()
+    for uid, pid, pname, rating, created_on, text in zip(
+        df["_review_uid"].tolist(),
+        df[cols.project_id].tolist(),
+        df[cols.project_name].tolist(),
+        ratings,
+        created,
+        df[cols.review_text].tolist(),
+    ):
+        text = str(text).strip()
         if not text:
             continue
         payloads.append({
-            "review_uid": str(r["_review_uid"]),
-            "project_id": str(r[cols.project_id]),
-            "project_name": str(r[cols.project_name]),
-            "rating": float(r["Rating"]) if ("Rating" in df.columns and pd.notna(r["Rating"])) else None,
-            "created_on": str(r["CreatedOn"]) if "CreatedOn" in df.columns else None,
+            "review_uid": str(uid),
+            "project_id": str(pid),
+            "project_name": str(pname),
+            "rating": float(rating) if pd.notna(rating) else None,
+            "created_on": created_on,
             "review_text": text,
         })
+    return payloads
 
-    if batch_size is not None:
-        payloads = payloads[:batch_size]
-
-    if not payloads:
-        print("[yellow]No non-empty reviews to process.[/yellow]")
-        return
 
-    packed = _pack_reviews_for_batch(payloads, max_tokens=settings.tag_batch_tokens)
+def generate_review_tags(
+    *,
+    csv_path: str,
+    out_dir: str,
+    resume: bool = True,
+    limit_rows: int | None = None,
+    only_project_id: str | None = None,
+    batch_size: int | None = None,
+    sleep_s: float = 0.0,
+    use_batch_api: bool = False,
+    rebuild_csv: bool = False,
+    chunksize: int | None = None,
+) -> None:
+    """
+    use_batch_api=True sends all packed batches through the OpenAI Batch API
+    (asynchronous, up to 24h, half price) instead of one live request per batch;
+    runs with fewer than settings.batch_api_min_reviews texts to tag stay live
+    (unless a submitted job is pending).
+    The CSV is extended batch by batch, right after the JSONL; rebuild_csv=True regenerates
+    it from the whole JSONL at the end instead (also done automatically when the CSV is missing/stale).
+    chunksize streams the CSV (see iter_reviews_csv): the next chunk of rows is parsed and
+    packed while the current one is being tagged, so memory stays O(chunksize) instead of O(file).
+    Duplicate texts are then only shared within a chunk.
+    """
+    # The Batch API path builds on this module's helpers, hence the local import
+    from review_summarizer.review_tags_batch import BATCH_JOB_STATE, run_batches_via_batch_api
 
-    # Also cap count per batch
-    final_batches: List[List[Dict[str, Any]]] = []
-    for b in packed:
-        for i in range(0, len(b), settings.tag_batch_max_reviews):
-            final_batches.append(b[i:i + settings.tag_batch_max_reviews])
+    if chunksize is not None and use_batch_api:
+        raise ValueError("chunksize can't be combined with use_batch_api (one Batch job covers the whole run)")
 
-    written = 0
+    out_path = Path(out_dir)
+    out_path.mkdir(parents=True, exist_ok=True)
 
-    for b in track(final_batches, total=len(final_batches), description="Generating tags"):
-        user_prompt = f"""Generate tags for each review item below.
+    settings = Settings.from_env(out_dir=out_dir)
 
-InputReviewsJSON:
-{json.dumps(b, ensure_ascii=False)}
+    jsonl_file = out_path / "review_tags.jsonl"
+    csv_file = out_path / "review_tags.csv"
 
-Return:
-- items: array of objects, each with review_uid and tags (exactly 3 tags).
-- One output per input review_uid.
-"""
-        resp = responses_parse(
-            client=client,
-            model=settings.model,
-            input_messages=[
-                {"role": "system", "content": SYSTEM_TAGS},
-                {"role": "user", "content": user_prompt},
-            ],
-            text_format=ReviewTagBatch,
-            temperature=settings.tag_temperature,
-        )
+    if not resume:
+        for fp in (jsonl_file, csv_file, done_ids_path(jsonl_file), out_path / BATCH_JOB_STATE):
+            if fp.exists():
+                fp.unlink()
 
-        parsed: ReviewTagBatch = resp.output_parsed
-        out_map: Dict[str, List[str]] = {}
-
-        for it in parsed.items:
-            raw_tags = it.tags
-            fixed = [_shorten_tag(t, 28) for t in raw_tags]
-            fixed = [t[:28].rstrip() for t in fixed]  # final clamp
-            out_map[it.review_uid] = fixed
-
-        # Ensure every input uid got output; regenerate missing individually
-        missing = [x for x in b if x["review_uid"] not in out_map]
-        if missing:
-            print(f"[yellow]Batch missing {len(missing)} items. Retrying individually.[/yellow]")
-            for one in missing:
-                fixed = _regen_single_review_tags(
-                    client=client,
-                    model=settings.model,
-                    temperature=settings.tag_temperature,
-                    review_obj=one,
-                )
-                out_map[one["review_uid"]] = fixed
-                if sleep_s > 0:
-                    time.sleep(sleep_s)
-
-        # If any tags still violate length or emptiness, regenerate individually (rare)
-        for one in b:
-            uid = one["review_uid"]
-            tags = out_map.get(uid)
-            if not tags or len(tags) != 3 or any((not t.strip()) for t in tags) or any(len(t) > 28 for t in tags):
-                out_map[uid] = _regen_single_review_tags(
-                    client=client,
-                    model=settings.model,
-                    temperature=settings.tag_temperature,
-                    review_obj=one,
-                )
+    processed = _load_processed_review_uids(jsonl_file) if resume else set()
+    rebuild_csv = rebuild_csv or csv_behind_jsonl(jsonl_file, csv_file)
+
+    if chunksize is None:
+        frames: Iterable[pd.DataFrame] = [read_reviews_csv(csv_path)[0]]
+    else:
+        frames = iter_reviews_csv(csv_path, chunksize=chunksize)
+    cols = ReviewColumns()
+
+    seen = {"rows": 0, "payloads": 0}
+    groups = _frame_batches(
+        frames,
+        settings=settings,
+        cols=cols,
+        processed=processed,
+        only_project_id=only_project_id,
+        limit_rows=limit_rows,
+        batch_size=batch_size,
+        seen=seen,
+    )
+    # The first frame with work is prepared up front: it decides whether outputs are opened
+    # at all (and the Batch API size gate); later chunks are prepared while tagging runs
+    first = next(groups, None)
+
+    if first is None:
+        if rebuild_csv:
+            _rebuild_csv_from_jsonl(jsonl_file, csv_file)
+        if seen["rows"] == 0:
+            print("[yellow]Nothing to process (all done or filtered out).[/yellow]")
+        else:
+            print("[yellow]No non-empty reviews to process.[/yellow]")
+        return
 
-        with jsonl_file.open("a", encoding="utf-8") as f:
-            for one in b:
-                uid = one["review_uid"]
-                tags = out_map.get(uid)
-                if not tags:
-                    continue
-                rec = {
-                    "review_uid": uid,
-                    "project_id": one["project_id"],
-                    "project_name": one["project_name"],
-                    "rating": one.get("rating"),
-                    "created_on": one.get("created_on"),
-                    "tag_1": tags[0],
-                    "tag_2": tags[1],
-                    "tag_3": tags[2],
-                }
-                f.write(json.dumps(rec, ensure_ascii=False) + "\n")
-                written += 1
-
-        if sleep_s > 0:
-            time.sleep(sleep_s)
-
-    _rebuild_csv_from_jsonl(jsonl_file, csv_file)
+    failures: List[BaseException] = []
+    final_batches, n_unique = first
+
+    # Output handles stay open for the whole run (one write + flush per batch)
+    with ExitStack() as stack:
+        jsonl_fp = stack.enter_context(jsonl_file.open("ab"))
+        ids_fp = stack.enter_context(done_ids_path(jsonl_file).open("a", encoding="utf-8"))
+        # A CSV that gets rebuilt at the end isn't appended to
+        csv_fp = None if rebuild_csv else stack.enter_context(csv_file.open("a", encoding="utf-8", newline=""))
+
+        if use_batch_api and n_unique < settings.batch_api_min_reviews and not (out_path / BATCH_JOB_STATE).exists():
+            print(
+                f"[yellow]Batch API:[/yellow] only {n_unique} reviews to tag "
+                f"(< OPENAI_BATCH_API_MIN_REVIEWS={settings.batch_api_min_reviews}); using live requests."
+            )
+            use_batch_api = False
+
+        if use_batch_api:
+            # No chunksize here, so the first frame is the whole run
+            written = run_batches_via_batch_api(
+                client=build_client(settings.openai_api_key),
+                settings=settings,
+                batches=final_batches,
+                out_path=out_path,
+                jsonl_file=jsonl_file,
+                jsonl_fp=jsonl_fp,
+                ids_fp=ids_fp,
+                csv_fp=csv_fp,
+                sleep_s=sleep_s,
+            )
+        else:
+            written, failures = asyncio.run(_tag_batches(
+                settings=settings,
+                batch_groups=chain([final_batches], (batches for batches, _ in groups)),
+                jsonl_fp=jsonl_fp,
+                ids_fp=ids_fp,
+                csv_fp=csv_fp,
+                sleep_s=sleep_s,
+            ))
+
+    if rebuild_csv:
+        _rebuild_csv_from_jsonl(jsonl_file, csv_file)
+
+    if failures:
+        print(
+            f"[red]{len(failures)} tag batch(es) failed[/red] (rows written in this run: {written}); "
+            "rerun with --resume to retry. First error:"
+        )
+        print(f"- {failures[0]!r}")
+        raise failures[0]
 
     print(f"[bold green]Done.[/bold green] Wrote {written} review tag rows.")
     print("[bold]Outputs:[/bold]")
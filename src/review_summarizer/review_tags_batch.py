@@ -0,0 +1,230 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from pathlib import Path
+from typing import IO, Any, Dict, List
+
+import orjson
+from pydantic import ValidationError
+from rich import print
+from rich.progress import track
+
+from review_summarizer.config import Settings
+from review_summarizer.openai_client import build_async_client
+from review_summarizer.ratelimit import AsyncLimiter
+from review_summarizer.review_tags import (
+    CACHE_KEY_TAGS,
+    _batch_messages,
+    _finalize_batch_tags,
+    _load_processed_review_uids,
+    _tag_records,
+    _write_tag_records,
+)
+from review_summarizer.tag_schemas import ReviewTagBatch
+
+
+# OpenAI Batch API path for review tags (--use-batch-api): the same packed batches and
+# post-processing as the live path, submitted as one job at half price.
+
+_BATCH_DONE_STATUSES = {"completed", "failed", "expired", "cancelled"}
+BATCH_JOB_STATE = "review_tags_batch_job.json"
+
+
+def _strict_json_schema(node: Any) -> Any:
+    """
+    Structured Outputs' strict form of a pydantic JSON schema: every object closed
+    (additionalProperties: false) with all of its properties required.
+    """
+    if isinstance(node, list):
+        return [_strict_json_schema(v) for v in node]
+    if not isinstance(node, dict):
+        return node
+    out = {k: _strict_json_schema(v) for k, v in node.items()}
+    if out.get("type") == "object":
+        out["required"] = list(out.get("properties", {}))
+        out["additionalProperties"] = False
+    return out
+
+
+# The text.format responses.parse derives from ReviewTagBatch, built here without the SDK's private helpers
+_TEXT_FORMAT = {
+    "type": "json_schema",
+    "strict": True,
+    "name": ReviewTagBatch.__name__,
+    "schema": _strict_json_schema(ReviewTagBatch.model_json_schema()),
+}
+
+
+def _batch_request_line(custom_id: str, b: List[Dict[str, Any]], settings: Settings) -> dict:
+    """
+    One /v1/responses request for the Batch API: same body responses_parse sends.
+    """
+    return {
+        "custom_id": custom_id,
+        "method": "POST",
+        "url": "/v1/responses",
+        "body": {
+            "model": settings.model,
+            "input": _batch_messages(b),
+            "temperature": settings.tag_temperature,
+            "store": False,
+            "prompt_cache_key": CACHE_KEY_TAGS,
+            "text": {"format": _TEXT_FORMAT},
+        },
+    }
+
+
+def _parse_batch_response_body(body: dict) -> ReviewTagBatch | None:
+    """
+    Successful Batch API response body -> parsed ReviewTagBatch (None on refusal/invalid JSON).
+    """
+    for item in body.get("output") or []:
+        if item.get("type") != "message":
+            continue
+        for c in item.get("content") or []:
+            if c.get("type") == "output_text":
+                try:
+                    return ReviewTagBatch.model_validate_json(c.get("text") or "")
+                except ValidationError:
+                    return None
+    return None
+
+
+def submit_batch(client, settings: Settings, batches: List[List[Dict[str, Any]]]) -> str:
+    """
+    Uploads one request line per packed batch (custom_id batch-<i>) and creates the job.
+    Returns the batch job id.
+    """
+    lines = b"".join(
+        orjson.dumps(_batch_request_line(f"batch-{i}", b, settings)) + b"\n" for i, b in enumerate(batches)
+    )
+    input_file = client.files.create(file=("review_tags_batch.jsonl", lines), purpose="batch")
+    job = client.batches.create(input_file_id=input_file.id, endpoint="/v1/responses", completion_window="24h")
+    return job.id
+
+
+def wait_for_batch(client, batch_id: str):
+    """
+    Polls until the job reaches a final status (backing off from 5s to 60s between polls).
+    """
+    delay = 5.0
+    while True:
+        batch = client.batches.retrieve(batch_id)
+        counts = batch.request_counts
+        done = f"{counts.completed + counts.failed}/{counts.total}" if counts else "?"
+        print(f"[bold]Batch {batch_id}:[/bold] {batch.status} ({done} requests)")
+        if batch.status in _BATCH_DONE_STATUSES:
+            return batch
+        time.sleep(delay)
+        delay = min(delay * 1.5, 60.0)
+
+
+async def _ingest_batch_results(
+    *,
+    settings: Settings,
+    pending: List[tuple[List[Dict[str, Any]], ReviewTagBatch | None]],
+    jsonl_fp: IO[bytes],
+    ids_fp: IO[str],
+    csv_fp: IO[str] | None,
+    skip_uids: set[str],
+    sleep_s: float,
+) -> int:
+    """
+    Writes Batch API answers in order through the same post-processing as the live path
+    (live per-review regeneration for missing/invalid answers). Returns the number of records written.
+    """
+    limiter = AsyncLimiter(
+        max_in_flight=settings.max_in_flight,
+        min_interval_s=sleep_s,
+        rpm=settings.rpm_limit,
+        tpm=settings.tpm_limit,
+    )
+    written = 0
+    async with build_async_client(settings.openai_api_key) as client:
+        for b, parsed in track(pending, total=len(pending), description="Ingesting tags"):
+            # Answers index into the batch as submitted, so finalize against the full batch
+            out_map = await _finalize_batch_tags(
+                client=client, limiter=limiter, settings=settings, b=b, parsed=parsed
+            )
+            records = _tag_records(b, out_map, skip_uids=skip_uids)
+            _write_tag_records(jsonl_fp, ids_fp, records, csv_fp)
+            written += len(records)
+    return written
+
+
+def run_batches_via_batch_api(
+    *,
+    client,
+    settings: Settings,
+    batches: List[List[Dict[str, Any]]],
+    out_path: Path,
+    jsonl_file: Path,
+    jsonl_fp: IO[bytes],
+    ids_fp: IO[str],
+    csv_fp: IO[str] | None,
+    sleep_s: float,
+) -> int:
+    """
+    Submits all packed batches as one OpenAI Batch job (lower price, separate rate limits),
+    waits for it, then ingests results through the same post-processing as the live path.
+    The submitted job is recorded in review_tags_batch_job.json, so an interrupted run
+    picks the same job up again (instead of paying for a new one) on the next start.
+    Requests that failed inside the job are left unwritten; rerun with --resume to retry them.
+    Answers that don't parse fall back to per-review regeneration, like the live path.
+    """
+    state_file = out_path / BATCH_JOB_STATE
+    already_written: set[str] = set()
+
+    if state_file.exists():
+        state = orjson.loads(state_file.read_bytes())
+        # A previous ingest may have stopped part-way: don't write those rows twice
+        already_written = _load_processed_review_uids(jsonl_file)
+        print(f"[bold]Batch API:[/bold] resuming submitted job {state['batch_id']}")
+    else:
+        batch_id = submit_batch(client, settings, batches)
+        state = {"batch_id": batch_id, "batches": {f"batch-{i}": b for i, b in enumerate(batches)}}
+        state_file.write_bytes(orjson.dumps(state))
+        print(f"[bold]Batch API:[/bold] submitted {len(batches)} requests as job {batch_id}")
+
+    job = wait_for_batch(client, state["batch_id"])
+
+    results: Dict[str, ReviewTagBatch | None] = {}
+    if job.output_file_id:
+        for line in client.files.content(job.output_file_id).content.splitlines():
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                obj = orjson.loads(line)
+            except Exception:
+                continue
+            resp = obj.get("response") or {}
+            if obj.get("error") or resp.get("status_code") != 200:
+                continue  # request-level failure: leave for a --resume rerun
+            results[obj.get("custom_id", "")] = _parse_batch_response_body(resp.get("body") or {})
+
+    pending: List[tuple[List[Dict[str, Any]], ReviewTagBatch | None]] = []
+    failed = 0
+    for custom_id, b in state["batches"].items():
+        if custom_id not in results:
+            failed += 1
+            continue
+        members = [m["review_uid"] for one in b for m in (one, *one.get("_duplicates", ()))]
+        if not all(uid in already_written for uid in members):
+            pending.append((b, results[custom_id]))
+
+    written = asyncio.run(_ingest_batch_results(
+        settings=settings,
+        pending=pending,
+        jsonl_fp=jsonl_fp,
+        ids_fp=ids_fp,
+        csv_fp=csv_fp,
+        skip_uids=already_written,
+        sleep_s=sleep_s,
+    ))
+
+    state_file.unlink()
+    if failed:
+        print(f"[yellow]Batch job {job.status}: {failed} request(s) returned no result; rerun with --resume to retry.[/yellow]")
+    return written
@@ -1,13 +1,94 @@
 from __future__ import annotations
 
 import hashlib
-from typing import Any
+from itertools import product
+from typing import Any, Dict, Iterable
+
+import pandas as pd
+
+from review_summarizer.io import ReviewColumns
 
 
 def make_review_uid(*, project_id: str, user_id: Any, created_on: Any, description: str) -> str:
     """
     Creates a stable UID even if CSV doesn't have ReviewId.
-    Uses SHA1 of key fields (enough for dedupe + resume).
+    Uses SHA1 of key fields (enough for dedupe + resume; not a security use, hence usedforsecurity=False).
     """
     raw = f"{project_id}|{str(user_id or '').strip()}|{str(created_on or '').strip()}|{str(description or '').strip()}"
-    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+    return hashlib.sha1(raw.encode("utf-8"), usedforsecurity=False).hexdigest()
+
+
+def make_review_uids(df: pd.DataFrame, columns: ReviewColumns) -> pd.Series:
+    """
+    make_review_uid for every row of a reviews frame (same format, same hashes).
+    Reads whole columns once instead of a row-wise df.apply, and inlines the
+    per-field normalization so each row costs one f-string and one sha1.
+    """
+    n = len(df)
+
+    def _col(name: str) -> list[Any]:
+        return df[name].tolist() if name in df.columns else [None] * n
+
+    sha1 = hashlib.sha1
+    # "" if not v else str(v).strip() is str(v or "").strip() from make_review_uid, minus the call
+    uids = [
+        sha1(
+            f"{pid}|{'' if not uid else str(uid).strip()}|{'' if not co else str(co).strip()}"
+            f"|{'' if not desc else str(desc).strip()}".encode("utf-8"),
+            usedforsecurity=False,
+        ).hexdigest()
+        for pid, uid, co, desc in zip(
+            df[columns.project_id].astype(str).tolist(),
+            _col(columns.user_id),
+            _col(columns.created_on),
+            _col(columns.review_text),
+        )
+    ]
+    return pd.Series(uids, index=df.index, dtype=object)
+
+
+def _numeric_forms(v: Any) -> list[Any]:
+    # The numbers pandas' inference could have turned an id cell into: int64, or float64 once
+    # the column had a missing value anywhere in the file
+    try:
+        forms: list[Any] = [float(v)]
+    except (TypeError, ValueError):
+        return []
+    try:
+        forms.append(int(v))
+    except (TypeError, ValueError):
+        pass
+    return forms
+
+
+def legacy_review_uid_map(df: pd.DataFrame, columns: ReviewColumns, uids: Iterable[str]) -> Dict[str, str]:
+    """
+    Legacy uid -> uid for the rows of df (uids: their make_review_uids values).
+    Before ProjectId / UserId were read as text, numeric ids were hashed as pandas inferred
+    them: "101" or "101.0" (float when the file had a missing id), and a UserId of 0 as "".
+    Outputs from those runs are matched through this map (resume, export join).
+    """
+    n = len(df)
+
+    def _col(name: str) -> list[Any]:
+        return df[name].tolist() if name in df.columns else [None] * n
+
+    sha1 = hashlib.sha1
+    out: Dict[str, str] = {}
+    for uid, pid, user, co, desc in zip(
+        uids,
+        df[columns.project_id].astype(str).tolist(),
+        _col(columns.user_id),
+        _col(columns.created_on),
+        _col(columns.review_text),
+    ):
+        pids = {pid, *(str(x) for x in _numeric_forms(pid))}
+        users = {"" if not user else str(user).strip(), *("" if not x else str(x) for x in _numeric_forms(user))}
+        if len(pids) == 1 and len(users) == 1:
+            continue
+        rest = f"|{'' if not co else str(co).strip()}|{'' if not desc else str(desc).strip()}"
+        for p, u in product(pids, users):
+            old = sha1(f"{p}|{u}{rest}".encode("utf-8"), usedforsecurity=False).hexdigest()
+            if old != uid:
+                out[old] = uid
+    return out
@@ -4,7 +4,7 @@ from pydantic import BaseModel, Field, field_validator
 
 
 class ReviewTagItem(BaseModel):
-    review_uid: str = Field(..., description="Deterministic unique id for the review row")
+    idx: int = Field(..., description="Position of the review in the input batch (the input item's idx)")
     tags: list[str] = Field(..., min_length=3, max_length=3, description="Exactly 3 UI tags (raw, may be long)")
 
     @field_validator("tags")
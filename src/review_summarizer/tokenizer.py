@@ -1,12 +1,18 @@
 from __future__ import annotations
 
+import codecs
+import os
 from dataclasses import dataclass
+from functools import lru_cache
 from typing import Iterable, List, Sequence
 
 import tiktoken
 
 
+@lru_cache(maxsize=1)
 def get_encoder():
+    # Loaded on first use rather than at import: tiktoken may have to download the encoding,
+    # and importing the pipeline (e.g. for tests that never count tokens) shouldn't need the network.
     # Prefer newest encoding if available; fall back safely.
     for name in ("o200k_base", "cl100k_base"):
         try:
@@ -16,11 +22,44 @@ def get_encoder():
     return tiktoken.get_encoding("cl100k_base")
 
 
-ENC = get_encoder()
+@lru_cache(maxsize=4096)
+def count_tokens(text: str) -> int:
+    # Cached: every request re-counts the same few system prompts. Kept small since
+    # the unique user payloads would otherwise pin their strings in memory.
+    # encode_ordinary like count_tokens_batch: review text that happens to contain
+    # special-token markup (e.g. "<|endoftext|>") is counted, not rejected.
+    if not text:
+        return 0
+    return len(get_encoder().encode_ordinary(text))
 
 
-def count_tokens(text: str) -> int:
-    return len(ENC.encode(text or ""))
+def count_tokens_batch(texts: Sequence[str]) -> List[int]:
+    """
+    Token counts for many texts in one call (tiktoken encodes the batch in Rust threads).
+    Special-token markup is counted as plain text rather than rejected.
+    """
+    if not texts:
+        return []
+    ids = get_encoder().encode_ordinary_batch([t or "" for t in texts], num_threads=os.cpu_count() or 1)
+    return [len(x) for x in ids]
+
+
+def _split_by_tokens(text: str, max_tokens: int) -> List[tuple[str, int]]:
+    """
+    (part, token count) slices of text, max_tokens tokens each: encoded once and cut on
+    token ids, so parts are never re-tokenized. Decoding goes through an incremental
+    UTF-8 decoder, so a character split across two slices lands whole in the second.
+    """
+    enc = get_encoder()
+    ids = enc.encode_ordinary(text)
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    parts: List[tuple[str, int]] = []
+    for start in range(0, len(ids), max_tokens):
+        part_ids = ids[start : start + max_tokens]
+        part = decoder.decode(enc.decode_bytes(part_ids), final=start + max_tokens >= len(ids))
+        if part:
+            parts.append((part, len(part_ids)))
+    return parts
 
 
 @dataclass(frozen=True)
@@ -40,15 +79,11 @@ def chunk_texts(texts: Sequence[str], *, max_tokens: int) -> List[Chunk]:
     buf_tokens = 0
     chunk_id = 1
 
-    for t in texts:
-        t_tokens = count_tokens(t)
-        # If a single item is too large, hard-split by chars to avoid failing.
+    texts = list(texts)
+    for t, t_tokens in zip(texts, count_tokens_batch(texts)):
+        # If a single item is too large, hard-split it into max_tokens-sized parts.
         if t_tokens > max_tokens:
-            # naive char split; still safe for token estimator
-            step = max(500, len(t) // 4)
-            for i in range(0, len(t), step):
-                part = t[i : i + step]
-                part_tokens = count_tokens(part)
+            for part, part_tokens in _split_by_tokens(t, max_tokens):
                 if buf_tokens + part_tokens > max_tokens and buf:
                     text = "\n".join(buf)
                     chunks.append(Chunk(chunk_id=chunk_id, text=text, token_estimate=buf_tokens))
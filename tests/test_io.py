@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+import pandas as pd
+
+from review_summarizer.io import ReviewColumns, iter_reviews_csv, read_reviews_csv
+from review_summarizer.review_uid import make_review_uids
+
+# The missing UserId / ProjectId only fall in the second block at chunksize=2
+CSV = (
+    "ProjectId,ProjectName,UserId,Description,Rating,CreatedOn\n"
+    "1,Alpha,101,Good location,4,2024-01-01 10:00:00\n"
+    "1,Alpha,0,Bad lifts,3,2024-01-02 10:00:00\n"
+    "2,Beta,,Okay,5,2024-01-03 10:00:00\n"
+    ",Beta,104,Meh,,2024-01-04 10:00:00\n"
+)
+
+
+def _write_csv(tmp_path):
+    p = tmp_path / "reviews.csv"
+    p.write_text(CSV, encoding="utf-8")
+    return p
+
+
+def test_chunked_read_matches_full_read(tmp_path):
+    p = _write_csv(tmp_path)
+    cols = ReviewColumns()
+
+    full, _ = read_reviews_csv(p)
+    chunked, _ = read_reviews_csv(p, chunksize=2)
+
+    assert chunked.dtypes.to_dict() == full.dtypes.to_dict()
+    pd.testing.assert_frame_equal(chunked, full)
+    assert make_review_uids(chunked, cols).tolist() == make_review_uids(full, cols).tolist()
+
+
+def test_streamed_chunks_hash_like_full_read(tmp_path):
+    p = _write_csv(tmp_path)
+    cols = ReviewColumns()
+
+    full, _ = read_reviews_csv(p)
+    for frame in iter_reviews_csv(p, chunksize=2):
+        # (ProjectId is categorical, with per-chunk categories)
+        for col in (cols.user_id, cols.created_on):
+            assert frame[col].dtype == full[col].dtype
+    streamed = [uid for frame in iter_reviews_csv(p, chunksize=2) for uid in make_review_uids(frame, cols)]
+
+    assert streamed == make_review_uids(full, cols).tolist()
@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from review_summarizer.ratelimit import AsyncLimiter
+
+
+class _Throttled(Exception):
+    # Shaped like openai.APIStatusError: status_code plus the response headers
+    def __init__(self, headers: dict[str, str]) -> None:
+        super().__init__("429")
+        self.status_code = 429
+        self.response = SimpleNamespace(headers=headers)
+
+
+def test_in_flight_cap():
+    async def main() -> int:
+        limiter = AsyncLimiter(max_in_flight=2)
+        active = peak = 0
+
+        async def call() -> None:
+            nonlocal active, peak
+            async with limiter.slot():
+                active += 1
+                peak = max(peak, active)
+                await asyncio.sleep(0.01)
+                active -= 1
+
+        await asyncio.gather(*[call() for _ in range(8)])
+        return peak
+
+    assert asyncio.run(main()) == 2
+
+
+def test_429_halves_cap_once_and_pauses_for_retry_after_ms():
+    async def main() -> tuple[int, float]:
+        limiter = AsyncLimiter(max_in_flight=8)
+        loop = asyncio.get_running_loop()
+
+        async def throttled() -> None:
+            with pytest.raises(_Throttled):
+                async with limiter.slot():
+                    await asyncio.sleep(0.01)
+                    raise _Throttled({"retry-after-ms": "200"})
+
+        # Both were in flight when the cap was cut: one congestion event, one decrease
+        await asyncio.gather(throttled(), throttled())
+        t0 = loop.time()
+        async with limiter.slot():
+            waited = loop.time() - t0
+        return limiter.concurrency, waited
+
+    concurrency, waited = asyncio.run(main())
+    assert concurrency == 4
+    assert waited >= 0.15
+
+
+def test_rpm_learned_from_headers():
+    async def main() -> tuple[int | None, float]:
+        limiter = AsyncLimiter(max_in_flight=4)
+        loop = asyncio.get_running_loop()
+        # 600 rpm refills one request per 0.1s; nothing is left right now
+        limiter.observe({"x-ratelimit-limit-requests": "600", "x-ratelimit-remaining-requests": "0"})
+        t0 = loop.time()
+        async with limiter.slot():
+            waited = loop.time() - t0
+        return limiter._rpm.capacity if limiter._rpm else None, waited
+
+    capacity, waited = asyncio.run(main())
+    assert capacity == 600
+    assert waited >= 0.08
+
+
+def test_tpm_credit_back_lets_next_request_start():
+    async def main() -> None:
+        limiter = AsyncLimiter(max_in_flight=4, tpm=1000)
+        async with limiter.slot(tokens=800) as reserved:
+            pass
+        assert reserved == 800
+        # Only 100 of the 800 reserved were used: the next 800 fit without waiting ~36s
+        limiter.settle(reserved=reserved, used=100)
+        async with limiter.slot(tokens=800):
+            pass
+
+    asyncio.run(asyncio.wait_for(main(), timeout=1))
+
+
+def test_settle_credits_the_capped_reservation():
+    async def main() -> float:
+        limiter = AsyncLimiter(max_in_flight=4, tpm=100)
+        # Bigger than the whole bucket: only its capacity is reserved
+        async with limiter.slot(tokens=500) as reserved:
+            pass
+        assert reserved == 100
+        limiter.settle(reserved=reserved, used=50)
+        return limiter._tpm._level
+
+    # Credited 100 - 50, not 500 - 50 (a little refill on top is fine)
+    assert 50 <= asyncio.run(main()) < 60
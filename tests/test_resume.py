@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+from review_summarizer.resume import append_done_ids, done_ids_path, load_done_ids
+
+
+def _write_jsonl(path, lines: list[str]) -> None:
+    path.write_text("".join(f"{line}\n" for line in lines), encoding="utf-8")
+
+
+def test_first_load_scans_jsonl_and_seeds_sidecar(tmp_path):
+    jsonl = tmp_path / "review_tags.jsonl"
+    _write_jsonl(jsonl, ['{"review_uid": "a", "tag_1": "X"}', '{"review_uid":"b","tag_1":"Y"}'])
+
+    assert load_done_ids(jsonl, id_field="review_uid") == {"a", "b"}
+    assert done_ids_path(jsonl).read_text(encoding="utf-8") == "a\nb\n"
+
+
+def test_existing_sidecar_is_trusted_and_appended(tmp_path):
+    jsonl = tmp_path / "review_tags.jsonl"
+    _write_jsonl(jsonl, ['{"review_uid": "a"}'])
+    load_done_ids(jsonl, id_field="review_uid")
+
+    # Later writers append the record and then its id; the JSONL isn't parsed again
+    with jsonl.open("a", encoding="utf-8") as f:
+        f.write('{"review_uid": "b"}\n')
+    with done_ids_path(jsonl).open("a", encoding="utf-8") as fp:
+        append_done_ids(fp, ["b"])
+    with jsonl.open("a", encoding="utf-8") as f:
+        f.write('{"review_uid": "not-in-sidecar"}\n')
+
+    assert load_done_ids(jsonl, id_field="review_uid") == {"a", "b"}
+
+
+def test_sidecar_without_jsonl_is_removed(tmp_path):
+    jsonl = tmp_path / "review_tags.jsonl"
+    done_ids_path(jsonl).write_text("a\nb\n", encoding="utf-8")
+
+    assert load_done_ids(jsonl, id_field="review_uid") == set()
+    assert not done_ids_path(jsonl).exists()
+
+
+def test_truncated_lines_are_ignored(tmp_path):
+    jsonl = tmp_path / "review_tags.jsonl"
+    # A crash mid-write leaves a partial last record
+    jsonl.write_text('{"review_uid": "a", "tag_1": "X"}\n{"review_uid": "b", "tag_', encoding="utf-8")
+    assert load_done_ids(jsonl, id_field="review_uid") == {"a"}
+
+    # ... or a partial last id in the sidecar
+    done_ids_path(jsonl).write_text("a\nc", encoding="utf-8")
+    assert load_done_ids(jsonl, id_field="review_uid") == {"a"}
+
+
+def test_other_layouts_fall_back_to_json_parse(tmp_path):
+    jsonl = tmp_path / "project_summaries.jsonl"
+    _write_jsonl(jsonl, [
+        '{"headline": "h", "project_id": "p1"}',  # id not first
+        '{"project_id": "p\\"2", "headline": "h"}',  # escaped quote in the id
+        '{ "project_id" : " p3 " }',  # spacing, padded value
+        "",
+        "not json",
+    ])
+
+    assert load_done_ids(jsonl, id_field="project_id") == {"p1", 'p"2', "p3"}
@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import random
+
+import pytest
+
+from review_summarizer.review_tags import _dedupe_payloads, _pack_reviews_for_batch, _tag_records
+
+MAX_TOKENS = 300
+MAX_REVIEWS = 5
+
+
+def _reviews(n: int = 200) -> list[dict]:
+    # Token estimates preset, so packing never calls the tokenizer; two are bigger than a whole batch
+    rng = random.Random(0)
+    sizes = [rng.randint(1, 150) for _ in range(n - 2)] + [MAX_TOKENS + 50, MAX_TOKENS]
+    return [{"review_uid": f"r{i}", "_token_est": t} for i, t in enumerate(sizes)]
+
+
+@pytest.mark.parametrize("strategy", ["fifo", "wfd"])
+def test_pack_keeps_every_review_within_limits(strategy):
+    reviews = _reviews()
+    batches = _pack_reviews_for_batch(reviews, MAX_TOKENS, MAX_REVIEWS, strategy=strategy)
+
+    packed = sorted(r["review_uid"] for b in batches for r in b)
+    assert packed == sorted(r["review_uid"] for r in reviews)
+    for b in batches:
+        assert 1 <= len(b) <= MAX_REVIEWS
+        # Only a review that is oversize on its own may exceed max_tokens, alone in its batch
+        assert sum(r["_token_est"] for r in b) <= MAX_TOKENS or len(b) == 1
+
+
+def test_pack_rejects_unknown_strategy():
+    with pytest.raises(ValueError):
+        _pack_reviews_for_batch(_reviews(10), MAX_TOKENS, MAX_REVIEWS, strategy="ffd")
+
+
+def _payload(uid: str, text: str) -> dict:
+    return {"review_uid": uid, "project_id": "1", "project_name": "Alpha", "review_text": text}
+
+
+def test_duplicates_get_the_representatives_tags():
+    reps = _dedupe_payloads([
+        _payload("a", "Good location"),
+        _payload("b", "Bad lifts"),
+        _payload("a2", "  good   LOCATION "),  # same text up to case and spacing
+    ])
+    assert [r["review_uid"] for r in reps] == ["a", "b"]
+
+    out_map = {"a": ["Good Location", "Green Spaces", "Calm"], "b": ["Slow Lifts", "Noisy", "Old"]}
+    records = _tag_records(reps, out_map)
+
+    assert [(r["review_uid"], r["tag_1"]) for r in records] == [
+        ("a", "Good Location"), ("a2", "Good Location"), ("b", "Slow Lifts")
+    ]
+
+
+def test_tag_records_skip_written_uids():
+    reps = _dedupe_payloads([_payload("a", "Good location"), _payload("a2", "good location")])
+    records = _tag_records(reps, {"a": ["Good Location", "Green Spaces", "Calm"]}, skip_uids={"a"})
+    # The representative was written before: only its duplicate is left
+    assert [r["review_uid"] for r in records] == ["a2"]
@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+import orjson
+
+from review_summarizer.resume import done_ids_path
+from review_summarizer.review_tags_batch import (
+    BATCH_JOB_STATE,
+    _parse_batch_response_body,
+    run_batches_via_batch_api,
+)
+
+TAGS = ["Good Location", "Green Spaces", "Calm"]
+
+
+def _body(text: str) -> dict:
+    return {"output": [{"type": "message", "content": [{"type": "output_text", "text": text}]}]}
+
+
+def _answer(n: int) -> str:
+    return orjson.dumps({"items": [{"idx": i, "tags": TAGS} for i in range(n)]}).decode()
+
+
+def test_parse_batch_response_body():
+    parsed = _parse_batch_response_body(_body(_answer(2)))
+    assert parsed is not None and [it.idx for it in parsed.items] == [0, 1]
+
+    assert _parse_batch_response_body(_body("not json")) is None
+    assert _parse_batch_response_body({"output": [{"type": "reasoning"}]}) is None
+    assert _parse_batch_response_body({}) is None
+
+
+class _FakeBatchClient:
+    # The parts of the OpenAI client a resumed job touches: batches.retrieve and files.content
+    def __init__(self, output: bytes) -> None:
+        counts = SimpleNamespace(completed=1, failed=1, total=2)
+        job = SimpleNamespace(status="completed", request_counts=counts, output_file_id="file-out")
+        self.batches = SimpleNamespace(retrieve=lambda batch_id: job)
+        self.files = SimpleNamespace(content=lambda file_id: SimpleNamespace(content=output))
+
+
+def _review(uid: str, **extra) -> dict:
+    return {"review_uid": uid, "project_id": "1", "project_name": "Alpha", "review_text": uid, **extra}
+
+
+def test_resumed_job_skips_failed_lines_and_written_uids(tmp_path, capsys):
+    batches = {
+        "batch-0": [_review("a", _duplicates=[_review("a2")]), _review("b")],
+        "batch-1": [_review("c")],
+    }
+    (tmp_path / BATCH_JOB_STATE).write_bytes(orjson.dumps({"batch_id": "batch_1", "batches": batches}))
+    # An earlier ingest got as far as "a" before it stopped
+    jsonl_file = tmp_path / "review_tags.jsonl"
+    jsonl_file.write_text('{"review_uid": "a"}\n', encoding="utf-8")
+    done_ids_path(jsonl_file).write_text("a\n", encoding="utf-8")
+
+    output = b"\n".join([
+        orjson.dumps({"custom_id": "batch-0", "response": {"status_code": 200, "body": _body(_answer(2))}}),
+        orjson.dumps({"custom_id": "batch-1", "response": {"status_code": 500, "body": {}}}),
+    ])
+    settings = SimpleNamespace(openai_api_key="test", max_in_flight=2, rpm_limit=0, tpm_limit=0)
+
+    with jsonl_file.open("ab") as jsonl_fp, done_ids_path(jsonl_file).open("a", encoding="utf-8") as ids_fp:
+        written = run_batches_via_batch_api(
+            client=_FakeBatchClient(output),
+            settings=settings,
+            batches=[],
+            out_path=tmp_path,
+            jsonl_file=jsonl_file,
+            jsonl_fp=jsonl_fp,
+            ids_fp=ids_fp,
+            csv_fp=None,
+            sleep_s=0.0,
+        )
+
+    # "a" was already written; "c" failed inside the job and is left for --resume
+    assert written == 2
+    lines = [orjson.loads(line) for line in jsonl_file.read_bytes().splitlines()]
+    assert [rec["review_uid"] for rec in lines] == ["a", "a2", "b"]
+    assert lines[1]["tag_1"] == "Good Location"
+    assert done_ids_path(jsonl_file).read_text(encoding="utf-8") == "a\na2\nb\n"
+    assert not (tmp_path / BATCH_JOB_STATE).exists()
+    assert "1 request(s) returned no result" in capsys.readouterr().out
@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import pandas as pd
+import pytest
+
+from review_summarizer.io import ReviewColumns, read_reviews_csv
+from review_summarizer.review_uid import legacy_review_uid_map, make_review_uid, make_review_uids
+
+HEADER = "ProjectId,ProjectName,UserId,Description,Rating,CreatedOn\n"
+
+# Uids the original pipeline wrote for these files, when ids were read with pandas' inferred dtypes
+BASELINE = {
+    "int_ids": (
+        "1,Alpha,101,Good location,4,2024-01-01 10:00:00\n"
+        "1,Alpha,0,Bad lifts,3,2024-01-02 10:00:00\n"
+        "2,Beta,102,Okay,5,2024-01-03 10:00:00\n",
+        [
+            "8efe66f5a5ea876a72469a4005b37f45d5b96dcd",
+            "d932ee9e23ced403e1c789895131ab16d40262c4",
+            "04c5a16b65f92868a316cedc73f16bc44fffef96",
+        ],
+    ),
+    "missing_user": (
+        "1,Alpha,101,Good location,4,2024-01-01 10:00:00\n"
+        "1,Alpha,,Bad lifts,3,2024-01-02 10:00:00\n"
+        "2,Beta,0,Okay,5,2024-01-03 10:00:00\n",
+        [
+            "53f1a7ad2854768e9b4c90b4c7a21a0cca9f1dc2",
+            "0dd672c861986264b18bd874803b0f335d98314d",
+            "d1000a45c606f48c7973788e0dd3dde4612892ba",
+        ],
+    ),
+    "text_user": (
+        "1,Alpha,u101,Good location,4,2024-01-01 10:00:00\n"
+        "1,Alpha,0,Bad lifts,3,2024-01-02 10:00:00\n"
+        "2,Beta, 0,Okay,5,2024-01-03 10:00:00\n",
+        [
+            "d54f4ba73c1be828caacbb0c8977fddbd6cb4e77",
+            "89330bbc06994d19d302d6c09509c8fc38357fc4",
+            "c797f6941a71c8f0edaf71571e305efc2c03e940",
+        ],
+    ),
+    "missing_pid": (
+        "1,Alpha,101,Good location,4,2024-01-01 10:00:00\n"
+        ",Alpha,102,Bad lifts,3,2024-01-02 10:00:00\n"
+        "2,Beta,103,Okay,5,2024-01-03 10:00:00\n",
+        [
+            "c5f7e01a95e37d52ed12889f9758a750065d0c80",
+            "06c6622cb499aaa674a339f4843cf651041f565a",
+            "2b0678813c607494e0d319aa9b67c443ed301e0d",
+        ],
+    ),
+}
+
+
+def _read(tmp_path, rows: str) -> pd.DataFrame:
+    p = tmp_path / "reviews.csv"
+    p.write_text(HEADER + rows, encoding="utf-8")
+    return read_reviews_csv(p)[0]
+
+
+@pytest.mark.parametrize("name", sorted(BASELINE))
+def test_baseline_uids_still_match(tmp_path, name):
+    rows, baseline = BASELINE[name]
+    df = _read(tmp_path, rows)
+    cols = ReviewColumns()
+    uids = make_review_uids(df, cols).tolist()
+    legacy = legacy_review_uid_map(df, cols, uids)
+
+    # Each review is found under its old uid: either unchanged or through the legacy map
+    for old, uid in zip(baseline, uids):
+        assert old == uid or legacy.get(old) == uid
+
+
+def test_text_ids_keep_baseline_uids(tmp_path):
+    # A UserId column that was already text hashes exactly as before, "0" included
+    rows, baseline = BASELINE["text_user"]
+    df = _read(tmp_path, rows)
+    assert make_review_uids(df, ReviewColumns()).tolist() == baseline
+
+
+def test_uids_match_scalar_helper(tmp_path):
+    df = _read(
+        tmp_path,
+        "1,Alpha, 0,Good location,4,2024-01-01 10:00:00\n"
+        "1,Alpha,0 ,Bad lifts,3, 2024-01-02 10:00:00\n"
+        "2,Beta,,  Okay ,5,\n"
+        "2,Beta,u7,Fine,,2024-01-04 10:00:00\n",
+    )
+    cols = ReviewColumns()
+    expected = [
+        make_review_uid(
+            project_id=str(pid),
+            user_id=user,
+            created_on=created,
+            description=desc,
+        )
+        for pid, user, created, desc in zip(
+            df[cols.project_id], df[cols.user_id], df[cols.created_on], df[cols.review_text]
+        )
+    ]
+    assert make_review_uids(df, cols).tolist() == expected